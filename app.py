@@ -7,13 +7,41 @@ diagnosing AWS resources.
 """
 
 import os
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+import threading
+import time
+from datetime import datetime
+from flask import Flask, render_template, request, flash, redirect, url_for
 from flask_login import LoginManager, login_required, current_user
 from config import config
 from routes.auth import auth_bp, init_auth
 from routes.dashboard import dashboard_bp
 from routes.api import api_bp
-from utils.helpers import validate_aws_credentials, get_instance_state_color
+from utils.helpers import probe_aws_credentials, get_instance_state_color
+from utils.orjson_response import ORJSONProvider, ojsonify
+from utils.converters import InstanceIDConverter
+
+# Last /health probe result, reused for HEALTH_CACHE_SECONDS
+HEALTH_CACHE_SECONDS = 30
+_last_health = {'ts': 0.0, 'valid': False}
+_health_lock = threading.Lock()
+
+def _aws_credentials_healthy():
+    """
+    Report whether AWS credentials were valid, probing at most every 30 seconds.
+    
+    Returns:
+        True if the most recent credential check succeeded
+    """
+    with _health_lock:
+        if time.monotonic() - _last_health['ts'] < HEALTH_CACHE_SECONDS:
+            return _last_health['valid']
+        
+        # Probe directly: this memo is the only cache /health goes through
+        creds_status = probe_aws_credentials()
+        
+        _last_health['valid'] = creds_status.valid
+        _last_health['ts'] = time.monotonic()
+        return _last_health['valid']
 
 def create_app(config_name='default'):
     """
@@ -30,9 +58,17 @@ def create_app(config_name='default'):
     # Load configuration
     app.config.from_object(config[config_name])
     
+    # Serialize JSON responses and the tojson filter with orjson
+    app.json = ORJSONProvider(app)
+    app.json.sort_keys = app.config['JSON_SORT_KEYS']
+    app.json.compact = not app.config['JSONIFY_PRETTYPRINT_REGULAR']
+    
     # Initialize extensions
     init_auth(app)
     
+    # URL converters must exist before blueprint rules are bound
+    app.url_map.converters['iid'] = InstanceIDConverter
+    
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(dashboard_bp)
@@ -42,15 +78,7 @@ def create_app(config_name='default'):
     @app.template_filter('get_state_class')
     def get_state_class(state):
         """Get Bootstrap color class for instance state."""
-        state_colors = {
-            'running': 'success',
-            'stopped': 'danger',
-            'pending': 'warning',
-            'terminated': 'secondary',
-            'stopping': 'warning',
-            'starting': 'info'
-        }
-        return state_colors.get(state.lower(), 'secondary')
+        return get_instance_state_color(state)
     
     # Error handlers
     @app.errorhandler(404)
@@ -66,20 +94,17 @@ def create_app(config_name='default'):
     def health_check():
         """Health check endpoint for load balancers and monitoring."""
         try:
-            # Check AWS credentials
-            creds_status = validate_aws_credentials()
-            
-            return jsonify({
+            return ojsonify({
                 'status': 'healthy',
-                'aws_credentials': creds_status['valid'],
-                'timestamp': '2024-01-01T00:00:00Z'
+                'aws_credentials': _aws_credentials_healthy(),
+                'timestamp': datetime.utcnow().isoformat()
             })
         except Exception as e:
-            return jsonify({
+            return ojsonify({
                 'status': 'unhealthy',
                 'error': str(e),
-                'timestamp': '2024-01-01T00:00:00Z'
-            }), 500
+                'timestamp': datetime.utcnow().isoformat()
+            }, 500)
     
     # Root redirect
     @app.route('/')
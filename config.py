@@ -14,6 +14,10 @@ class Config:
     SECRET_KEY = os.environ.get('FLASK_SECRET_KEY') or 'dev-secret-key-change-in-production'
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # JSON output (compact, insertion-ordered keys even in debug mode)
+    JSON_SORT_KEYS = False
+    JSONIFY_PRETTYPRINT_REGULAR = False
+    
     # AWS configuration
     AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
@@ -23,6 +27,9 @@ class Config:
     INSTANCES_PER_PAGE = 20
     METRICS_DURATION_HOURS = 1
     CPU_ALERT_THRESHOLD = 80.0
+    CLOUDWATCH_CACHE_TTL = 60  # seconds
+    CLOUDWATCH_RATE_LIMIT = 50  # requests per second, per region
+    METRICS_MAX_INSTANCES = 50  # instance IDs per /api/metrics request
     
     # Supported AWS regions
     SUPPORTED_REGIONS = [
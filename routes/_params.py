@@ -0,0 +1,32 @@
+"""
+Query argument parsing shared by the route blueprints.
+"""
+from flask import request
+from werkzeug.exceptions import BadRequest
+
+from services._session import SUPPORTED_REGIONS
+
+
+def requested_region(use_cookie: bool = False) -> str:
+    """
+    Get the AWS region named by ?region=, defaulting to us-east-1.
+
+    Args:
+        use_cookie: Fall back to the selected_region cookie when the query
+            argument is missing, as the HTML pages do
+
+    Returns:
+        Region name from SUPPORTED_REGIONS, the set clients may be created for
+
+    Raises:
+        BadRequest: If the region is not supported
+    """
+    region = request.args.get('region')
+    if not region and use_cookie:
+        region = request.cookies.get('selected_region')
+    region = region or 'us-east-1'
+
+    if region not in SUPPORTED_REGIONS:
+        raise BadRequest(f"Unsupported region {region!r}; expected one of: "
+                         f"{', '.join(sorted(SUPPORTED_REGIONS))}")
+    return region
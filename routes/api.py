@@ -2,19 +2,45 @@
 API routes for AWS Diagnostic Tool.
 Handles AJAX requests and data endpoints for dynamic content.
 """
-from flask import Blueprint, request, jsonify
+import re
+from flask import Blueprint, current_app, request
 from flask_login import login_required
-from services.ec2_service import EC2Service
-from services.cloudwatch_service import CloudWatchService
-from services.logs_service import LogsService
-from utils.helpers import calculate_alert_status
-import json
+from werkzeug.exceptions import BadRequest
+from services.ec2_service import get_ec2_service
+from services.cloudwatch_service import STATISTICS, get_cloudwatch_service
+from services.logs_service import get_logs_service
+from routes._params import requested_region
+from utils.helpers import calculate_alert_status, get_aws_regions
+from utils.converters import InstanceIDConverter
+from utils.orjson_response import ojsonify, json_endpoint, stream_json_list
 
 # Create blueprint
 api_bp = Blueprint('api', __name__)
 
-@api_bp.route('/api/metrics/<instance_id>')
+# Same pattern the iid URL converter enforces on single-instance routes
+_INSTANCE_ID_RE = re.compile(InstanceIDConverter.regex)
+
+def _requested_statistics():
+    """
+    Get the CloudWatch statistics named in the ?statistics= query argument.
+    
+    Returns:
+        Tuple of distinct statistic names in request order, ('Average',)
+        when the argument is absent
+        
+    Raises:
+        BadRequest: If the list is empty or names an unknown statistic
+    """
+    names = request.args.get('statistics', 'Average').split(',')
+    # dict.fromkeys drops repeats while keeping the first occurrence's order
+    statistics = tuple(dict.fromkeys(name.strip() for name in names))
+    if any(stat not in STATISTICS for stat in statistics):
+        raise BadRequest(f"statistics must be a comma-separated list of: {', '.join(STATISTICS)}")
+    return statistics
+
+@api_bp.route('/api/metrics/<iid:instance_id>', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_metrics(instance_id):
     """
     Get CloudWatch metrics for a specific instance.
@@ -22,26 +48,50 @@ def get_metrics(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        hours = int(request.args.get('hours', 1))
-        
-        cloudwatch_service = CloudWatchService(region)
-        metrics = cloudwatch_service.get_all_metrics(instance_id, hours)
-        
-        return jsonify({
-            'success': True,
-            'metrics': metrics
-        })
-        
-    except Exception as e:
-        return jsonify({
+    region = requested_region()
+    hours = int(request.args.get('hours', 1))
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    metrics = cloudwatch_service.get_all_metrics(instance_id, hours, _requested_statistics())
+    
+    return {
+        'metrics': metrics
+    }
+
+@api_bp.route('/api/metrics', provide_automatic_options=False)
+@login_required
+@json_endpoint
+def get_metrics_multi():
+    """
+    Get CloudWatch metrics for the instances listed in ?instance_ids=.
+    """
+    region = requested_region()
+    hours = int(request.args.get('hours', 1))
+    instance_ids = [i for i in request.args.get('instance_ids', '').split(',') if i]
+    
+    if not instance_ids:
+        return ojsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'instance_ids parameter is required'
+        }, 400)
+    
+    max_instances = current_app.config['METRICS_MAX_INSTANCES']
+    if len(instance_ids) > max_instances:
+        raise BadRequest(f"At most {max_instances} instance_ids may be requested at once")
+    invalid = [i for i in instance_ids if not _INSTANCE_ID_RE.fullmatch(i)]
+    if invalid:
+        raise BadRequest(f"Invalid instance IDs: {', '.join(invalid)}")
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    metrics = cloudwatch_service.get_metrics_multi(instance_ids, hours, _requested_statistics())
+    
+    return {
+        'metrics': metrics
+    }
 
-@api_bp.route('/api/metrics/<instance_id>/cpu')
+@api_bp.route('/api/metrics/<iid:instance_id>/cpu', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_cpu_metrics(instance_id):
     """
     Get CPU utilization metrics for a specific instance.
@@ -49,26 +99,19 @@ def get_cpu_metrics(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        hours = int(request.args.get('hours', 1))
-        
-        cloudwatch_service = CloudWatchService(region)
-        cpu_data = cloudwatch_service.get_cpu_utilization(instance_id, hours)
-        
-        return jsonify({
-            'success': True,
-            'cpu_data': cpu_data
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    hours = int(request.args.get('hours', 1))
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    cpu_data = cloudwatch_service.get_cpu_utilization(instance_id, hours, _requested_statistics())
+    
+    return {
+        'cpu_data': cpu_data
+    }
 
-@api_bp.route('/api/metrics/<instance_id>/network')
+@api_bp.route('/api/metrics/<iid:instance_id>/network', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_network_metrics(instance_id):
     """
     Get network metrics for a specific instance.
@@ -76,26 +119,19 @@ def get_network_metrics(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        hours = int(request.args.get('hours', 1))
-        
-        cloudwatch_service = CloudWatchService(region)
-        network_data = cloudwatch_service.get_network_metrics(instance_id, hours)
-        
-        return jsonify({
-            'success': True,
-            'network_data': network_data
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    hours = int(request.args.get('hours', 1))
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    network_data = cloudwatch_service.get_network_metrics(instance_id, hours, _requested_statistics())
+    
+    return {
+        'network_data': network_data
+    }
 
-@api_bp.route('/api/metrics/<instance_id>/disk')
+@api_bp.route('/api/metrics/<iid:instance_id>/disk', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_disk_metrics(instance_id):
     """
     Get disk metrics for a specific instance.
@@ -103,26 +139,19 @@ def get_disk_metrics(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        hours = int(request.args.get('hours', 1))
-        
-        cloudwatch_service = CloudWatchService(region)
-        disk_data = cloudwatch_service.get_disk_metrics(instance_id, hours)
-        
-        return jsonify({
-            'success': True,
-            'disk_data': disk_data
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    hours = int(request.args.get('hours', 1))
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    disk_data = cloudwatch_service.get_disk_metrics(instance_id, hours, _requested_statistics())
+    
+    return {
+        'disk_data': disk_data
+    }
 
-@api_bp.route('/api/logs/<instance_id>')
+@api_bp.route('/api/logs/<iid:instance_id>', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_instance_logs(instance_id):
     """
     Get logs for a specific instance.
@@ -130,49 +159,35 @@ def get_instance_logs(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        hours = int(request.args.get('hours', 1))
-        
-        logs_service = LogsService(region)
-        logs_data = logs_service.get_instance_logs(instance_id, hours)
-        
-        return jsonify({
-            'success': True,
-            'logs': logs_data
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    hours = int(request.args.get('hours', 1))
+    
+    logs_service = get_logs_service(region)
+    logs_data = logs_service.get_instance_logs(instance_id, hours)
+    
+    return {
+        'logs': logs_data
+    }
 
-@api_bp.route('/api/logs/groups')
+@api_bp.route('/api/logs/groups', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_log_groups():
     """
     Get available CloudWatch log groups.
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        
-        logs_service = LogsService(region)
-        log_groups = logs_service.get_log_groups()
-        
-        return jsonify({
-            'success': True,
-            'log_groups': log_groups
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    
+    logs_service = get_logs_service(region)
+    log_groups = logs_service.get_log_groups()
+    
+    return {
+        'log_groups': log_groups
+    }
 
-@api_bp.route('/api/logs/groups/<log_group_name>/streams')
+@api_bp.route('/api/logs/groups/<log_group_name>/streams', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_log_streams(log_group_name):
     """
     Get log streams for a specific log group.
@@ -180,57 +195,41 @@ def get_log_streams(log_group_name):
     Args:
         log_group_name: Name of the log group
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        
-        logs_service = LogsService(region)
-        log_streams = logs_service.get_log_streams(log_group_name)
-        
-        return jsonify({
-            'success': True,
-            'log_streams': log_streams
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    
+    logs_service = get_logs_service(region)
+    log_streams = logs_service.get_log_streams(log_group_name)
+    
+    return {
+        'log_streams': log_streams
+    }
 
-@api_bp.route('/api/logs/search')
+@api_bp.route('/api/logs/search', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def search_logs():
     """
     Search logs using filter patterns.
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        log_group_name = request.args.get('log_group')
-        filter_pattern = request.args.get('filter_pattern', '')
-        hours = int(request.args.get('hours', 1))
-        
-        if not log_group_name:
-            return jsonify({
-                'success': False,
-                'error': 'Log group name is required'
-            }), 400
-        
-        logs_service = LogsService(region)
-        events = logs_service.search_logs(log_group_name, filter_pattern, hours)
-        
-        return jsonify({
-            'success': True,
-            'events': events
-        })
-        
-    except Exception as e:
-        return jsonify({
+    region = requested_region()
+    log_group_name = request.args.get('log_group')
+    filter_pattern = request.args.get('filter_pattern', '')
+    hours = int(request.args.get('hours', 1))
+    
+    if not log_group_name:
+        return ojsonify({
             'success': False,
-            'error': str(e)
-        }), 500
+            'error': 'Log group name is required'
+        }, 400)
+    
+    logs_service = get_logs_service(region)
+    events = logs_service.iter_search_logs(log_group_name, filter_pattern, hours)
+    
+    return stream_json_list('events', events)
 
-@api_bp.route('/api/instance/<instance_id>/status')
+@api_bp.route('/api/instance/<iid:instance_id>/status', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_instance_status(instance_id):
     """
     Get detailed status for a specific instance.
@@ -238,25 +237,18 @@ def get_instance_status(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        
-        ec2_service = EC2Service(region)
-        status = ec2_service.get_instance_status(instance_id)
-        
-        return jsonify({
-            'success': True,
-            'status': status
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    
+    ec2_service = get_ec2_service(region)
+    status = ec2_service.get_instance_status(instance_id)
+    
+    return {
+        'status': status
+    }
 
-@api_bp.route('/api/instance/<instance_id>/console')
+@api_bp.route('/api/instance/<iid:instance_id>/console', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_console_output(instance_id):
     """
     Get console output for a specific instance.
@@ -264,25 +256,18 @@ def get_console_output(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        
-        ec2_service = EC2Service(region)
-        console_output = ec2_service.get_instance_console_output(instance_id)
-        
-        return jsonify({
-            'success': True,
-            'console_output': console_output
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    
+    ec2_service = get_ec2_service(region)
+    console_output = ec2_service.get_instance_console_output(instance_id)
+    
+    return {
+        'console_output': console_output
+    }
 
-@api_bp.route('/api/alarms/<instance_id>')
+@api_bp.route('/api/alarms/<iid:instance_id>', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_instance_alarms(instance_id):
     """
     Get CloudWatch alarms for a specific instance.
@@ -290,84 +275,52 @@ def get_instance_alarms(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        
-        cloudwatch_service = CloudWatchService(region)
-        alarms = cloudwatch_service.get_metric_alarms(instance_id)
-        
-        return jsonify({
-            'success': True,
-            'alarms': alarms
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    alarms = cloudwatch_service.get_metric_alarms(instance_id)
+    
+    return {
+        'alarms': alarms
+    }
 
-@api_bp.route('/api/regions')
+@api_bp.route('/api/regions', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_regions():
     """
     Get available AWS regions.
     """
-    try:
-        from utils.helpers import get_aws_regions
-        
-        regions = get_aws_regions()
-        
-        return jsonify({
-            'success': True,
-            'regions': regions
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    regions = get_aws_regions()
+    
+    return {
+        'regions': regions
+    }
 
-@api_bp.route('/api/instances/filter')
+@api_bp.route('/api/instances/filter', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def filter_instances():
     """
     Filter instances by various criteria.
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        state = request.args.get('state', '')
-        instance_type = request.args.get('instance_type', '')
-        name_pattern = request.args.get('name_pattern', '')
-        
-        ec2_service = EC2Service(region)
-        instances = ec2_service.get_all_instances()
-        
-        # Apply filters
-        if state:
-            instances = [i for i in instances if i['state'].lower() == state.lower()]
-        
-        if instance_type:
-            instances = [i for i in instances if instance_type.lower() in i['instance_type'].lower()]
-        
-        if name_pattern:
-            instances = [i for i in instances if name_pattern.lower() in i['name'].lower()]
-        
-        return jsonify({
-            'success': True,
-            'instances': instances,
-            'count': len(instances)
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    
+    ec2_service = get_ec2_service(region)
+    instances = ec2_service.filter_instances(
+        state=request.args.get('state', ''),
+        instance_type=request.args.get('instance_type', ''),
+        name_pattern=request.args.get('name_pattern', '')
+    )
+    
+    return {
+        'instances': instances,
+        'count': len(instances)
+    }
 
-@api_bp.route('/api/metrics/available/<instance_id>')
+@api_bp.route('/api/metrics/available/<iid:instance_id>', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_available_metrics(instance_id):
     """
     Get available metrics for a specific instance.
@@ -375,25 +328,18 @@ def get_available_metrics(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        
-        cloudwatch_service = CloudWatchService(region)
-        metrics = cloudwatch_service.get_available_metrics(instance_id)
-        
-        return jsonify({
-            'success': True,
-            'metrics': metrics
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    region = requested_region()
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    metrics = cloudwatch_service.get_available_metrics(instance_id)
+    
+    return {
+        'metrics': metrics
+    }
 
-@api_bp.route('/api/metrics/<instance_id>/custom/<metric_name>')
+@api_bp.route('/api/metrics/<iid:instance_id>/custom/<metric_name>', provide_automatic_options=False)
 @login_required
+@json_endpoint
 def get_custom_metric(instance_id, metric_name):
     """
     Get a custom metric for a specific instance.
@@ -402,20 +348,12 @@ def get_custom_metric(instance_id, metric_name):
         instance_id: The EC2 instance ID
         metric_name: Name of the metric to fetch
     """
-    try:
-        region = request.args.get('region', 'us-east-1')
-        hours = int(request.args.get('hours', 1))
-        
-        cloudwatch_service = CloudWatchService(region)
-        metric_data = cloudwatch_service.get_custom_metric(instance_id, metric_name, hours)
-        
-        return jsonify({
-            'success': True,
-            'metric_data': metric_data
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500 
\ No newline at end of file
+    region = requested_region()
+    hours = int(request.args.get('hours', 1))
+    
+    cloudwatch_service = get_cloudwatch_service(region)
+    metric_data = cloudwatch_service.get_custom_metric(instance_id, metric_name, hours, _requested_statistics())
+    
+    return {
+        'metric_data': metric_data
+    } 
\ No newline at end of file
@@ -4,7 +4,9 @@ Handles login, logout, and user session management.
 """
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import check_password_hash
+from werkzeug.security import check_password_hash, generate_password_hash
+from functools import lru_cache
+import hmac
 import os
 
 # Create blueprint
@@ -26,6 +28,26 @@ class User:
 DEFAULT_USERNAME = os.environ.get('ADMIN_USERNAME', 'admin')
 DEFAULT_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')
 
+@lru_cache(maxsize=1)
+def _password_hash():
+    """Hash the admin password once, on first login rather than at import."""
+    return generate_password_hash(DEFAULT_PASSWORD)
+
+def _check_credentials(username, password):
+    """
+    Check submitted credentials in constant time.
+    
+    Args:
+        username: Submitted username
+        password: Submitted password
+        
+    Returns:
+        True if both match the configured admin credentials
+    """
+    username_ok = hmac.compare_digest((username or '').encode(), DEFAULT_USERNAME.encode())
+    password_ok = check_password_hash(_password_hash(), password or '')
+    return username_ok and password_ok
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """
@@ -39,7 +61,7 @@ def login():
         password = request.form.get('password')
         
         # Simple authentication (replace with database in production)
-        if username == DEFAULT_USERNAME and password == DEFAULT_PASSWORD:
+        if _check_credentials(username, password):
             user = User(username)
             login_user(user)
             
@@ -90,7 +112,12 @@ def init_auth(app):
     
     @login_manager.user_loader
     def load_user(user_id):
-        """Load user from session."""
+        """
+        Load user from session.
+        
+        Users are stateless wrappers around the username, so this costs no
+        lookup; the session must also carry the flag set by login().
+        """
         if session.get('authenticated'):
             return User(user_id)
         return None 
\ No newline at end of file
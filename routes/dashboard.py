@@ -2,17 +2,33 @@
 Dashboard routes for AWS Diagnostic Tool.
 Handles main dashboard views and instance overview.
 """
-from flask import Blueprint, render_template, request, jsonify, flash, current_app, redirect, url_for
+from flask import Blueprint, render_template, request, flash, current_app, redirect, url_for
 from flask_login import login_required, current_user
-from services.ec2_service import EC2Service
-from services.cloudwatch_service import CloudWatchService
-from utils.helpers import validate_aws_credentials, get_aws_regions, calculate_alert_status
-import json
+from services.ec2_service import get_ec2_service
+from services.cloudwatch_service import get_cloudwatch_service
+from routes._params import requested_region
+from utils.helpers import validate_aws_credentials, get_aws_regions
+from utils.orjson_response import ojsonify, json_endpoint
+from utils.concurrency import submit
 from datetime import datetime
 
 # Create blueprint
 dashboard_bp = Blueprint('dashboard', __name__)
 
+def _instances_with_status(region_name):
+    """
+    Get the region's instances annotated with CPU alert status.
+    
+    Args:
+        region_name: AWS region name
+        
+    Returns:
+        Cached, read-only list of annotated instance dictionaries
+    """
+    return get_ec2_service(region_name).get_all_instances_with_status(
+        ttl=current_app.config['CLOUDWATCH_CACHE_TTL']
+    )
+
 @dashboard_bp.route('/')
 @dashboard_bp.route('/dashboard')
 @login_required
@@ -20,14 +36,15 @@ def index():
     """
     Main dashboard page showing EC2 instances overview.
     """
+    # Get selected region from query parameters or session; unknown
+    # regions are rejected with 400 before anything is loaded
+    selected_region = requested_region(use_cookie=True)
+    
     try:
-        # Get selected region from query parameters or session
-        selected_region = request.args.get('region') or request.cookies.get('selected_region', 'us-east-1')
-        
         # Validate AWS credentials
         creds_status = validate_aws_credentials()
-        if not creds_status['valid']:
-            flash(f"AWS credentials error: {creds_status['error']}", 'error')
+        if not creds_status.valid:
+            flash(f"AWS credentials error: {creds_status.error}", 'error')
             return render_template('dashboard.html', 
                                  instances=[], 
                                  summary={}, 
@@ -39,34 +56,12 @@ def index():
         regions = get_aws_regions()
         
         # Initialize services
-        ec2_service = EC2Service(selected_region)
+        ec2_service = get_ec2_service(selected_region)
         
-        # Get instances and summary
-        instances = ec2_service.get_all_instances()
+        # Get instances with alert status and summary
+        instances = _instances_with_status(selected_region)
         summary = ec2_service.get_instance_summary()
         
-        # Calculate alerts for running instances
-        cloudwatch_service = CloudWatchService(selected_region)
-        for instance in instances:
-            if instance['state'] == 'running':
-                try:
-                    # Get latest CPU utilization
-                    cpu_data = cloudwatch_service.get_cpu_utilization(instance['instance_id'], hours=1)
-                    if cpu_data:
-                        latest_cpu = cpu_data[-1]['average'] if cpu_data else 0
-                        alert_status = calculate_alert_status(latest_cpu)
-                        instance['alert_status'] = alert_status
-                        instance['current_cpu'] = latest_cpu
-                    else:
-                        instance['alert_status'] = {'alert': False, 'severity': 'none', 'message': 'No CPU data available'}
-                        instance['current_cpu'] = 0
-                except Exception:
-                    instance['alert_status'] = {'alert': False, 'severity': 'none', 'message': 'Error fetching CPU data'}
-                    instance['current_cpu'] = 0
-            else:
-                instance['alert_status'] = {'alert': False, 'severity': 'none', 'message': 'Instance not running'}
-                instance['current_cpu'] = 0
-        
         return render_template('dashboard.html',
                              instances=instances,
                              summary=summary,
@@ -83,7 +78,7 @@ def index():
                              selected_region='us-east-1',
                              creds_error=True)
 
-@dashboard_bp.route('/instance/<instance_id>')
+@dashboard_bp.route('/instance/<iid:instance_id>')
 @login_required
 def instance_detail(instance_id):
     """
@@ -92,12 +87,12 @@ def instance_detail(instance_id):
     Args:
         instance_id: The EC2 instance ID
     """
+    selected_region = requested_region(use_cookie=True)
+    
     try:
-        selected_region = request.args.get('region') or request.cookies.get('selected_region', 'us-east-1')
-        
         # Initialize services
-        ec2_service = EC2Service(selected_region)
-        cloudwatch_service = CloudWatchService(selected_region)
+        ec2_service = get_ec2_service(selected_region)
+        cloudwatch_service = get_cloudwatch_service(selected_region)
         
         # Get instance details
         instance = ec2_service.get_instance_by_id(instance_id)
@@ -105,22 +100,29 @@ def instance_detail(instance_id):
             flash(f"Instance {instance_id} not found.", 'error')
             return redirect(url_for('dashboard.index'))
         
+        # Status, metrics and console output are independent requests, so
+        # overlap them instead of waiting on each in turn
+        running = instance['state'] == 'running'
+        status_future = submit(ec2_service.get_instance_status, instance_id)
+        metrics_future = submit(cloudwatch_service.get_all_metrics, instance_id, hours=1) if running else None
+        console_future = submit(ec2_service.get_instance_console_output, instance_id) if running else None
+        
         # Get instance status
-        status = ec2_service.get_instance_status(instance_id)
+        status = status_future.result()
         
         # Get metrics if instance is running
         metrics = None
-        if instance['state'] == 'running':
+        if metrics_future:
             try:
-                metrics = cloudwatch_service.get_all_metrics(instance_id, hours=1)
+                metrics = metrics_future.result()
             except Exception as e:
                 flash(f"Error fetching metrics: {str(e)}", 'warning')
         
         # Get console output
         console_output = None
-        if instance['state'] == 'running':
+        if console_future:
             try:
-                console_output = ec2_service.get_instance_console_output(instance_id)
+                console_output = console_future.result()
             except Exception as e:
                 flash(f"Error fetching console output: {str(e)}", 'warning')
         
@@ -137,104 +139,74 @@ def instance_detail(instance_id):
 
 @dashboard_bp.route('/api/instances')
 @login_required
+@json_endpoint
 def api_instances():
     """
     API endpoint to get instances data for AJAX requests.
     """
-    try:
-        selected_region = request.args.get('region', 'us-east-1')
-        state_filter = request.args.get('state', '')
-        
-        ec2_service = EC2Service(selected_region)
-        instances = ec2_service.get_all_instances()
-        
-        # Apply state filter if provided
-        if state_filter:
-            instances = [i for i in instances if i['state'].lower() == state_filter.lower()]
-        
-        return jsonify({
-            'success': True,
-            'instances': instances,
-            'count': len(instances)
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    selected_region = requested_region()
+    state_filter = request.args.get('state', '')
+    
+    instances = _instances_with_status(selected_region)
+    
+    # Apply state filter if provided
+    if state_filter:
+        instances = [i for i in instances if i['state'].lower() == state_filter.lower()]
+    
+    return {
+        'instances': instances,
+        'count': len(instances)
+    }
 
 @dashboard_bp.route('/api/summary')
 @login_required
+@json_endpoint
 def api_summary():
     """
     API endpoint to get instance summary statistics.
     """
-    try:
-        selected_region = request.args.get('region', 'us-east-1')
-        
-        ec2_service = EC2Service(selected_region)
-        summary = ec2_service.get_instance_summary()
-        
-        return jsonify({
-            'success': True,
-            'summary': summary
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    selected_region = requested_region()
+    
+    ec2_service = get_ec2_service(selected_region)
+    summary = ec2_service.get_instance_summary()
+    
+    return {
+        'summary': summary
+    }
 
 @dashboard_bp.route('/api/alerts')
 @login_required
+@json_endpoint
 def api_alerts():
     """
     API endpoint to get instances with alerts.
     """
-    try:
-        selected_region = request.args.get('region', 'us-east-1')
-        
-        ec2_service = EC2Service(selected_region)
-        cloudwatch_service = CloudWatchService(selected_region)
-        
-        instances = ec2_service.get_running_instances()
-        alerts = []
-        
-        for instance in instances:
-            try:
-                cpu_data = cloudwatch_service.get_cpu_utilization(instance['instance_id'], hours=1)
-                if cpu_data:
-                    latest_cpu = cpu_data[-1]['average'] if cpu_data else 0
-                    alert_status = calculate_alert_status(latest_cpu)
-                    if alert_status['alert']:
-                        alerts.append({
-                            'instance_id': instance['instance_id'],
-                            'name': instance['name'],
-                            'cpu_utilization': latest_cpu,
-                            'alert_status': alert_status
-                        })
-            except Exception:
-                continue
-        
-        return jsonify({
-            'success': True,
-            'alerts': alerts,
-            'count': len(alerts)
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    selected_region = requested_region()
+    
+    alerts = [
+        {
+            'instance_id': instance['instance_id'],
+            'name': instance['name'],
+            'cpu_utilization': instance['current_cpu'],
+            'alert_status': instance['alert_status']
+        }
+        for instance in _instances_with_status(selected_region)
+        if instance['state'] == 'running' and instance['alert_status'].alert
+    ]
+    
+    return {
+        'alerts': alerts,
+        'count': len(alerts)
+    }
 
-@dashboard_bp.route('/health')
+@dashboard_bp.route('/health/details')
 @login_required
 def health_check():
     """
-    Health check endpoint for the application.
+    Detailed health check for signed-in users, including EC2 access.
+    
+    Lives under /health/details so the unauthenticated /health probe
+    registered by the app stays reachable for load balancers.
     """
     try:
         # Check AWS credentials
@@ -242,15 +214,15 @@ def health_check():
         
         # Check if we can access EC2
         ec2_status = {'status': 'unknown', 'error': None}
-        if creds_status['valid']:
+        if creds_status.valid:
             try:
-                ec2_service = EC2Service()
+                ec2_service = get_ec2_service()
                 ec2_service.get_instance_summary()
                 ec2_status = {'status': 'healthy', 'error': None}
             except Exception as e:
                 ec2_status = {'status': 'unhealthy', 'error': str(e)}
         
-        return jsonify({
+        return ojsonify({
             'application': 'healthy',
             'aws_credentials': creds_status,
             'ec2_service': ec2_status,
@@ -258,8 +230,8 @@ def health_check():
         })
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             'application': 'unhealthy',
             'error': str(e),
             'timestamp': datetime.utcnow().isoformat()
-        }), 500 
\ No newline at end of file
+        }, 500) 
\ No newline at end of file
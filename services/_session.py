@@ -0,0 +1,129 @@
+"""
+Shared boto3 session and client factory for the AWS services.
+
+boto3 and botocore are imported on first use, not at import time. The
+botocore exception classes the services catch are available here as
+attributes (e.g. _session.ClientError), which load botocore.exceptions
+the first time they are read.
+"""
+import threading
+from functools import lru_cache
+
+from config import Config
+from utils.rate_limit import TokenBucket
+
+# One session and tuned client config shared by every service and region,
+# both built by _get_session
+_SESSION = None
+_CLIENT_CONFIG = None
+_SESSION_LOCK = threading.Lock()
+
+# botocore.exceptions names served lazily by __getattr__
+_BOTOCORE_ERRORS = frozenset({'BotoCoreError', 'ClientError', 'NoCredentialsError'})
+
+# Regions clients may be created for. Region names arrive from query
+# arguments, so anything else is rejected before it reaches the unbounded
+# client cache below.
+SUPPORTED_REGIONS = frozenset(Config.SUPPORTED_REGIONS) | {Config.AWS_DEFAULT_REGION}
+
+# Client-side request rate limits per service, in requests per second
+_RATE_LIMITS = {'cloudwatch': Config.CLOUDWATCH_RATE_LIMIT}
+
+
+def __getattr__(name: str):
+    """Load a botocore exception class on first access."""
+    if name in _BOTOCORE_ERRORS:
+        from botocore import exceptions
+        value = globals()[name] = getattr(exceptions, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get_session():
+    """
+    Get the shared boto3 session, importing boto3 and creating it on first use.
+    
+    Deferring the import keeps it off the startup path of processes and
+    tests that never talk to AWS.
+    """
+    global _SESSION, _CLIENT_CONFIG
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import boto3
+                from botocore.config import Config as ClientConfig
+                # Adaptive retries back off client-side when AWS throttles the
+                # concurrent fan-out; the pool covers a gunicorn worker's request
+                # threads plus the shared AWS thread pool hitting one client at once
+                _CLIENT_CONFIG = ClientConfig(
+                    retries={'max_attempts': 10, 'mode': 'adaptive'},
+                    max_pool_connections=32,
+                    tcp_keepalive=True
+                )
+                _SESSION = boto3.session.Session()
+    return _SESSION
+
+
+def check_region(region_name: str) -> None:
+    """
+    Reject regions outside SUPPORTED_REGIONS.
+
+    Args:
+        region_name: AWS region name
+
+    Raises:
+        ValueError: If the region is not supported
+    """
+    if region_name not in SUPPORTED_REGIONS:
+        raise ValueError(f"Unsupported AWS region: {region_name!r}")
+
+
+@lru_cache(maxsize=None)
+def get_client(service_name: str, region_name: str):
+    """
+    Get the shared boto3 client for a service and region.
+
+    Clients come from one session, so credentials are resolved once and
+    each (service, region) pair keeps a single keep-alive connection pool.
+    boto3 clients are thread-safe and may be shared across requests.
+
+    Services listed in _RATE_LIMITS get a token bucket on the client
+    itself: every HTTP request it sends, including retries and paginator
+    pages, first takes a token. The cache never evicts, so each client
+    gets exactly one bucket.
+
+    Args:
+        service_name: AWS service name, e.g. 'ec2' or 'cloudwatch'
+        region_name: AWS region name
+
+    Returns:
+        boto3 client
+
+    Raises:
+        ValueError: If the region is not supported
+    """
+    check_region(region_name)
+    session = _get_session()
+    # Session.client() is not thread-safe
+    with _SESSION_LOCK:
+        client = session.client(service_name, region_name=region_name, config=_CLIENT_CONFIG)
+    
+    rate = _RATE_LIMITS.get(service_name)
+    if rate is not None:
+        bucket = TokenBucket(rate)
+        client.meta.events.register(f'before-send.{service_name}', lambda **kwargs: bucket.acquire())
+    return client
+
+
+def has_credentials() -> bool:
+    """
+    Check whether the shared session can find AWS credentials.
+
+    This only consults the local credential chain (environment, config
+    files, instance metadata) and makes no API call, so credentials that
+    are present but invalid still count.
+
+    Returns:
+        True if credentials were found
+    """
+    return _get_session().get_credentials() is not None
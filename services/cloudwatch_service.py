@@ -2,487 +2,786 @@
 CloudWatch service module for AWS Diagnostic Tool.
 Handles all CloudWatch-related operations using Boto3.
 """
-import boto3
-from typing import Dict, List, Any, Optional
-from botocore.exceptions import ClientError, NoCredentialsError
+from functools import cached_property, lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
+from operator import itemgetter
 import random
-from utils.helpers import format_metric_data, get_time_range
+import threading
+import time
+from cachetools import TTLCache
+from concurrent.futures import Future
+from config import Config
+from services import _session
+from services._session import check_region, get_client, has_credentials
+from utils.concurrency import submit
+from utils.helpers import get_time_range
+
+# Cache lookup sentinel, distinct from a cached None
+_MISSING = object()
+
+# Output column for each CloudWatch statistic a caller may request
+_STAT_COLUMNS = {
+    'Average': 'averages',
+    'Maximum': 'maximums',
+    'Minimum': 'minimums',
+    'Sum': 'sums',
+    'SampleCount': 'sample_counts'
+}
+
+# Units of the standard AWS/EC2 metrics; GetMetricData does not report them
+_EC2_METRIC_UNITS = {
+    'CPUUtilization': 'Percent',
+    'NetworkIn': 'Bytes',
+    'NetworkOut': 'Bytes',
+    'NetworkPacketsIn': 'Count',
+    'NetworkPacketsOut': 'Count',
+    'DiskReadBytes': 'Bytes',
+    'DiskWriteBytes': 'Bytes',
+    'DiskReadOps': 'Count',
+    'DiskWriteOps': 'Count',
+    'StatusCheckFailed': 'Count',
+    'StatusCheckFailed_Instance': 'Count',
+    'StatusCheckFailed_System': 'Count',
+    'CPUCreditUsage': 'Count',
+    'CPUCreditBalance': 'Count'
+}
+
+# Datapoint key for each series column, used by to_rows
+_ROW_KEYS = {'timestamps': 'timestamp'}
+_ROW_KEYS.update((column, column[:-1]) for column in _STAT_COLUMNS.values())
+
+# Standard AWS/EC2 metrics checked for instance alarms by get_metric_alarms
+_ALARM_METRICS = ('CPUUtilization', 'StatusCheckFailed', 'StatusCheckFailed_Instance',
+                  'StatusCheckFailed_System', 'NetworkIn', 'NetworkOut')
+
+# Metrics returned by get_all_metrics
+_ALL_METRICS = ('CPUUtilization', 'NetworkIn', 'NetworkOut', 'DiskReadBytes', 'DiskWriteBytes')
+
+# Demo-mode load per instance role: average CPU percent and typical
+# byte rates for each network and disk series
+_DEMO_PROFILES = {
+    'database': {'cpu': 75.0, 'network_in': 5000000, 'network_out': 2000000,
+                 'disk_read': 2000000, 'disk_write': 1500000},
+    'backup': {'cpu': 0.0, 'network_in': 0, 'network_out': 0,
+               'disk_read': 0, 'disk_write': 0},
+    'default': {'cpu': 45.0, 'network_in': 8000000, 'network_out': 4000000,
+                'disk_read': 1000000, 'disk_write': 800000}
+}
+
+# Statistic names the metric methods accept
+STATISTICS = tuple(_STAT_COLUMNS)
+
+# Supported values for CloudWatchService(cache_policy=...)
+CACHE_POLICIES = ('enabled', 'read_only', 'disabled')
+
+
+class CloudWatchError(Exception):
+    """Raised when a CloudWatch request fails; the botocore error is chained as __cause__."""
 
 
 class CloudWatchService:
     """Service class for CloudWatch operations."""
     
-    def __init__(self, region_name: str = 'us-east-1'):
+    # Common request parameters for EC2 instance metrics
+    _NAMESPACE = 'AWS/EC2'
+    _DEFAULT_PERIOD = 300
+    
+    def __init__(self, region_name: str = 'us-east-1', cache_policy: str = 'enabled',
+                 cache_ttl: int = 60):
         """
         Initialize CloudWatch service with specified region.
         
         Args:
             region_name: AWS region name
+            cache_policy: 'enabled' to read and store cached results,
+                'read_only' to serve existing entries without storing new
+                ones, or 'disabled' to always call CloudWatch
+            cache_ttl: Seconds to keep cached metric results
         """
+        if cache_policy not in CACHE_POLICIES:
+            raise ValueError(f"cache_policy must be one of {CACHE_POLICIES}, got {cache_policy!r}")
+        
         self.region_name = region_name
-        self.demo_mode = False
+        self.cache_policy = cache_policy
+        self._cache = TTLCache(maxsize=4096, ttl=cache_ttl)
+        self._available_metrics_cache = TTLCache(maxsize=1024, ttl=600)
+        self._alarms_cache = TTLCache(maxsize=1024, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[Any, Future] = {}
+        self._inflight_lock = threading.Lock()
+    
+    @cached_property
+    def client(self):
+        """Shared, rate-limited CloudWatch client for the region, created on first use."""
+        return get_client('cloudwatch', self.region_name)
+    
+    @cached_property
+    def demo_mode(self) -> bool:
+        """Whether to serve sample metrics, decided on first use so creating the service stays free of boto3."""
+        # Checked locally; invalid credentials surface as CloudWatchError on use
+        if has_credentials():
+            return False
+        print("⚠️  CloudWatch: Running in DEMO MODE with sample metrics data.")
+        return True
+    
+    @staticmethod
+    def _dims(instance_id: str) -> List[Dict[str, str]]:
+        """Build the InstanceId dimension list for a metric request."""
+        return [{'Name': 'InstanceId', 'Value': instance_id}]
+    
+    def _metric_query(self, query_id: str, instance_id: str, metric_name: str, stat: str,
+                      period: int = _DEFAULT_PERIOD) -> Dict[str, Any]:
+        """
+        Build one GetMetricData query for an AWS/EC2 instance metric.
+        
+        Args:
+            query_id: Query Id, unique within the request
+            instance_id: The EC2 instance ID
+            metric_name: AWS/EC2 metric name
+            stat: CloudWatch statistic to fetch
+            period: Datapoint period in seconds
+            
+        Returns:
+            MetricDataQueries entry
+        """
+        return {
+            'Id': query_id,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': self._NAMESPACE,
+                    'MetricName': metric_name,
+                    'Dimensions': self._dims(instance_id)
+                },
+                'Period': period,
+                'Stat': stat
+            }
+        }
+    
+    def _cache_key(self, kind: str, instance_id: str, hours: int, *extra: Any) -> tuple:
+        """
+        Build a cache key for a metric query.
+        
+        The current time is rounded down the same way as the query's time
+        window, so repeated polls that would fetch the same datapoints share
+        one entry.
+        
+        Args:
+            kind: Name of the query type
+            instance_id: The EC2 instance ID
+            hours: Number of hours to look back
+            *extra: Further arguments that change the query
+            
+        Returns:
+            Hashable cache key
+        """
+        alignment = _alignment(_pick_period(hours))
+        window_end = int(time.time()) // alignment * alignment
+        return (kind, instance_id, hours, window_end) + extra
+    
+    def _cache_get(self, key: Any, cache: Optional[TTLCache] = None) -> Any:
+        """Return the cached value for key (in the metrics cache by default), or _MISSING."""
+        if self.cache_policy == 'disabled':
+            return _MISSING
+        with self._cache_lock:
+            return (self._cache if cache is None else cache).get(key, _MISSING)
+    
+    def _cache_put(self, key: Any, value: Any, cache: Optional[TTLCache] = None) -> Any:
+        """Store value under key when the policy allows it, and return it."""
+        if self.cache_policy == 'enabled':
+            with self._cache_lock:
+                (self._cache if cache is None else cache)[key] = value
+        return value
+    
+    def _cached(self, key: Any, fetch: Callable[[], Any], cache: Optional[TTLCache] = None) -> Any:
+        """
+        Return the cached value for key, calling fetch() on a miss.
+        
+        Concurrent misses for the same key are coalesced: the first caller
+        runs fetch() and the others wait for its result (or its exception)
+        instead of issuing the same CloudWatch request again. Keys must be
+        unique across all caches, since in-flight calls are tracked together.
+        
+        Args:
+            key: Cache key of the query
+            fetch: Callable producing the value from CloudWatch
+            cache: Cache to use, the metrics cache by default
+            
+        Returns:
+            Cached or freshly fetched value
+        """
+        cached = self._cache_get(key, cache)
+        if cached is not _MISSING:
+            return cached
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        
+        if not leader:
+            return future.result()
         
         try:
-            self.client = boto3.client('cloudwatch', region_name=region_name)
-            # Test credentials by making a simple call
-            self.client.list_metrics(Limit=1)
-        except (NoCredentialsError, ClientError):
-            self.demo_mode = True
-            print("⚠️  CloudWatch: Running in DEMO MODE with sample metrics data.")
+            value = self._cache_put(key, fetch(), cache)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
     
-    def get_cpu_utilization(self, instance_id: str, hours: int = 1) -> List[Dict[str, Any]]:
+    def get_cpu_utilization(self, instance_id: str, hours: int = 1,
+                            statistics: Sequence[str] = ('Average',)) -> Dict[str, Any]:
         """
         Get CPU utilization metrics for an instance.
         
+        Served from get_all_metrics, so the CPU chart and the full metrics
+        view share one GetMetricData request and cache entry.
+        
         Args:
             instance_id: The EC2 instance ID
             hours: Number of hours to look back
+            statistics: CloudWatch statistics to fetch
+            
+        Returns:
+            CPU utilization series
+        """
+        if self.demo_mode:
+            return self._get_demo_cpu_data(instance_id, hours, statistics)
+        
+        return self.get_all_metrics(instance_id, hours, statistics)['cpu']
+    
+    def get_latest_cpu(self, instance_id: str) -> Optional[float]:
+        """
+        Get the most recent average CPU utilization for an instance.
+        
+        Only the last two 5-minute periods are requested (basic monitoring
+        publishes with a few minutes of delay), so CloudWatch returns at most
+        a couple of datapoints instead of a full hour.
+        
+        Args:
+            instance_id: The EC2 instance ID
             
         Returns:
-            List of CPU utilization data points
+            Latest average CPU utilization, or None if no data is available
         """
         if self.demo_mode:
-            return self._get_demo_cpu_data(instance_id, hours)
+            return self._get_demo_cpu_data(instance_id, 1)['averages'][-1]
             
         try:
-            start_time, end_time = get_time_range(hours)
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(minutes=10)
             
             response = self.client.get_metric_statistics(
-                Namespace='AWS/EC2',
+                Namespace=self._NAMESPACE,
                 MetricName='CPUUtilization',
-                Dimensions=[
-                    {
-                        'Name': 'InstanceId',
-                        'Value': instance_id
-                    }
-                ],
+                Dimensions=self._dims(instance_id),
                 StartTime=start_time,
                 EndTime=end_time,
-                Period=300,  # 5-minute intervals
-                Statistics=['Average', 'Maximum', 'Minimum']
+                Period=self._DEFAULT_PERIOD,
+                Statistics=['Average']
             )
             
-            return self._format_cpu_data(response['Datapoints'])
+            datapoints = response['Datapoints']
+            if not datapoints:
+                return None
+            
+            return max(datapoints, key=itemgetter('Timestamp'))['Average']
             
-        except ClientError as e:
-            raise Exception(f"Error fetching CPU metrics: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise CloudWatchError(f"Error fetching CPU metrics: {e}") from e
     
-    def get_network_metrics(self, instance_id: str, hours: int = 1) -> Dict[str, List[Dict[str, Any]]]:
+    def get_cpu_batch(self, instance_ids: List[str]) -> Dict[str, Optional[float]]:
         """
-        Get network metrics (NetworkIn, NetworkOut) for an instance.
+        Get the most recent average CPU utilization for many instances at once.
+        
+        Uses one GetMetricData request (up to 500 queries each) instead of a
+        GetMetricStatistics call per instance.
         
         Args:
-            instance_id: The EC2 instance ID
-            hours: Number of hours to look back
+            instance_ids: EC2 instance IDs
             
         Returns:
-            Dictionary with NetworkIn and NetworkOut data
+            Dictionary mapping instance ID to latest average CPU utilization,
+            or None if no data is available
         """
         if self.demo_mode:
-            return self._get_demo_network_data(instance_id, hours)
-            
+            return {instance_id: self.get_latest_cpu(instance_id) for instance_id in instance_ids}
+        
         try:
-            start_time, end_time = get_time_range(hours)
-            
-            # Get NetworkIn metrics
-            network_in_response = self.client.get_metric_statistics(
-                Namespace='AWS/EC2',
-                MetricName='NetworkIn',
-                Dimensions=[
-                    {
-                        'Name': 'InstanceId',
-                        'Value': instance_id
-                    }
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=300,
-                Statistics=['Average', 'Maximum', 'Minimum']
-            )
-            
-            # Get NetworkOut metrics
-            network_out_response = self.client.get_metric_statistics(
-                Namespace='AWS/EC2',
-                MetricName='NetworkOut',
-                Dimensions=[
-                    {
-                        'Name': 'InstanceId',
-                        'Value': instance_id
-                    }
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=300,
-                Statistics=['Average', 'Maximum', 'Minimum']
-            )
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(minutes=10)
+            
+            queries = [
+                self._metric_query(f'm{i}', instance_id, 'CPUUtilization', 'Average')
+                for i, instance_id in enumerate(instance_ids)
+            ]
+            results = self._get_metric_data(queries, start_time, end_time)
+            
+            latest = {}
+            for i, instance_id in enumerate(instance_ids):
+                values = results.get(f'm{i}', {}).get('Values')
+                latest[instance_id] = values[0] if values else None
+            return latest
+            
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise CloudWatchError(f"Error fetching CPU metrics: {e}") from e
+    
+    def _get_metric_data(self, queries: List[Dict[str, Any]], start_time: datetime,
+                         end_time: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        Run GetMetricData queries, following NextToken and the 500-query limit.
+        
+        Args:
+            queries: MetricDataQueries entries with unique Ids
+            start_time: Start of the time range
+            end_time: End of the time range
             
-            return {
-                'network_in': self._format_network_data(network_in_response['Datapoints']),
-                'network_out': self._format_network_data(network_out_response['Datapoints'])
+        Returns:
+            Dictionary mapping query Id to {'Timestamps': [...], 'Values': [...]},
+            newest datapoint first
+        """
+        results = {}
+        
+        for offset in range(0, len(queries), 500):
+            kwargs = {
+                'MetricDataQueries': queries[offset:offset + 500],
+                'StartTime': start_time,
+                'EndTime': end_time,
+                'ScanBy': 'TimestampDescending'
             }
             
-        except ClientError as e:
-            raise Exception(f"Error fetching network metrics: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+            while True:
+                response = self.client.get_metric_data(**kwargs)
+                
+                for result in response['MetricDataResults']:
+                    merged = results.setdefault(result['Id'], {'Timestamps': [], 'Values': []})
+                    merged['Timestamps'].extend(result.get('Timestamps', []))
+                    merged['Values'].extend(result.get('Values', []))
+                
+                if 'NextToken' not in response:
+                    break
+                kwargs['NextToken'] = response['NextToken']
+        
+        return results
+    
+    def get_network_metrics(self, instance_id: str, hours: int = 1,
+                            statistics: Sequence[str] = ('Average',)) -> Dict[str, Dict[str, Any]]:
+        """
+        Get network metrics (NetworkIn, NetworkOut) for an instance.
+        
+        Args:
+            instance_id: The EC2 instance ID
+            hours: Number of hours to look back
+            statistics: CloudWatch statistics to fetch
+            
+        Returns:
+            Dictionary with NetworkIn and NetworkOut data
+        """
+        if self.demo_mode:
+            return self._get_demo_network_data(instance_id, hours, statistics)
+        
+        return self.get_all_metrics(instance_id, hours, statistics)['network']
     
-    def get_disk_metrics(self, instance_id: str, hours: int = 1) -> Dict[str, List[Dict[str, Any]]]:
+    def get_disk_metrics(self, instance_id: str, hours: int = 1,
+                         statistics: Sequence[str] = ('Average',)) -> Dict[str, Dict[str, Any]]:
         """
         Get disk metrics for an instance.
         
         Args:
             instance_id: The EC2 instance ID
             hours: Number of hours to look back
+            statistics: CloudWatch statistics to fetch
             
         Returns:
             Dictionary with disk read/write data
         """
         if self.demo_mode:
-            return self._get_demo_disk_data(instance_id, hours)
-            
-        try:
-            start_time, end_time = get_time_range(hours)
-            
-            # Get DiskReadBytes metrics
-            disk_read_response = self.client.get_metric_statistics(
-                Namespace='AWS/EC2',
-                MetricName='DiskReadBytes',
-                Dimensions=[
-                    {
-                        'Name': 'InstanceId',
-                        'Value': instance_id
-                    }
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=300,
-                Statistics=['Average', 'Maximum', 'Minimum']
-            )
-            
-            # Get DiskWriteBytes metrics
-            disk_write_response = self.client.get_metric_statistics(
-                Namespace='AWS/EC2',
-                MetricName='DiskWriteBytes',
-                Dimensions=[
-                    {
-                        'Name': 'InstanceId',
-                        'Value': instance_id
-                    }
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=300,
-                Statistics=['Average', 'Maximum', 'Minimum']
-            )
-            
-            return {
-                'disk_read': self._format_disk_data(disk_read_response['Datapoints']),
-                'disk_write': self._format_disk_data(disk_write_response['Datapoints'])
-            }
-            
-        except ClientError as e:
-            raise Exception(f"Error fetching disk metrics: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+            return self._get_demo_disk_data(instance_id, hours, statistics)
+        
+        return self.get_all_metrics(instance_id, hours, statistics)['disk']
     
-    def get_all_metrics(self, instance_id: str, hours: int = 1) -> Dict[str, Any]:
+    def get_all_metrics(self, instance_id: str, hours: int = 1,
+                        statistics: Sequence[str] = ('Average',)) -> Dict[str, Any]:
         """
         Get all available metrics for an instance.
         
+        CPU, network and disk series are fetched together in a single
+        GetMetricData request rather than one call per metric.
+        
         Args:
             instance_id: The EC2 instance ID
             hours: Number of hours to look back
+            statistics: CloudWatch statistics to fetch
             
         Returns:
             Dictionary with all metrics data
         """
+        statistics = tuple(statistics)
+        
+        def fetch():
+            datapoints = self._get_metric_data_batch([instance_id], _ALL_METRICS, hours, statistics)
+            return self._all_metrics_from_datapoints(instance_id, hours, datapoints[instance_id], statistics)
+        
         try:
-            cpu_data = self.get_cpu_utilization(instance_id, hours)
-            network_data = self.get_network_metrics(instance_id, hours)
-            disk_data = self.get_disk_metrics(instance_id, hours)
-            
-            return {
-                'cpu': cpu_data,
-                'network': network_data,
-                'disk': disk_data,
-                'timestamp': datetime.utcnow().isoformat(),
-                'instance_id': instance_id,
-                'duration_hours': hours
-            }
-            
-        except Exception as e:
-            raise Exception(f"Error fetching all metrics: {str(e)}")
-
-    def _get_demo_cpu_data(self, instance_id: str, hours: int = 1) -> List[Dict[str, Any]]:
-        """Generate demo CPU utilization data."""
-        data = []
-        now = datetime.utcnow()
-        
-        # Generate different CPU patterns based on instance ID
-        if 'database' in instance_id.lower() or '0987654321' in instance_id:
-            base_cpu = 75.0  # High CPU for database server
-        elif 'backup' in instance_id.lower() or 'abcdef' in instance_id:
-            base_cpu = 0.0   # No CPU for stopped instance
-        else:
-            base_cpu = 45.0  # Normal CPU for web server
+            if self.demo_mode:
+                return self._metrics_payload(
+                    instance_id,
+                    hours,
+                    self.get_cpu_utilization(instance_id, hours, statistics),
+                    self.get_network_metrics(instance_id, hours, statistics),
+                    self.get_disk_metrics(instance_id, hours, statistics)
+                )
+            
+            return self._cached(self._cache_key('all', instance_id, hours, statistics), fetch)
+            
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise CloudWatchError(f"Error fetching all metrics: {e}") from e
+    
+    def get_metrics_multi(self, instance_ids: Sequence[str], hours: int = 1,
+                          statistics: Sequence[str] = ('Average',)) -> Dict[str, Dict[str, Any]]:
+        """
+        Get all metrics for several instances at once.
+        
+        Instances without a cached result are fetched together through
+        GetMetricData (up to 500 queries per request) instead of one
+        get_all_metrics round trip per instance.
         
-        for i in range(hours * 12):  # 5-minute intervals
-            timestamp = now - timedelta(minutes=5 * i)
+        Args:
+            instance_ids: EC2 instance IDs
+            hours: Number of hours to look back
+            statistics: CloudWatch statistics to fetch
             
-            if base_cpu == 0.0:
-                cpu_value = 0.0
+        Returns:
+            Dictionary mapping instance ID to its get_all_metrics result
+        """
+        statistics = tuple(statistics)
+        if self.demo_mode:
+            return {instance_id: self.get_all_metrics(instance_id, hours, statistics) for instance_id in instance_ids}
+        
+        metrics = {}
+        missing = []
+        for instance_id in dict.fromkeys(instance_ids):
+            cached = self._cache_get(self._cache_key('all', instance_id, hours, statistics))
+            if cached is _MISSING:
+                missing.append(instance_id)
             else:
-                # Add some realistic variation
-                variation = random.uniform(-10, 15)
-                cpu_value = max(0, min(100, base_cpu + variation))
-            
-            data.append({
-                'timestamp': timestamp.isoformat(),
-                'average': round(cpu_value, 2),
-                'maximum': round(cpu_value + random.uniform(0, 5), 2),
-                'minimum': round(max(0, cpu_value - random.uniform(0, 5)), 2)
-            })
-        
-        return data[::-1]  # Reverse to show oldest first
-
-    def _get_demo_network_data(self, instance_id: str, hours: int = 1) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate demo network data."""
-        network_in = []
-        network_out = []
-        now = datetime.utcnow()
-        
-        # Different network patterns based on instance type
-        if 'database' in instance_id.lower() or '0987654321' in instance_id:
-            base_in = 5000000   # 5 MB/s average
-            base_out = 2000000  # 2 MB/s average
-        elif 'backup' in instance_id.lower() or 'abcdef' in instance_id:
-            base_in = 0
-            base_out = 0
-        else:
-            base_in = 8000000   # 8 MB/s average for web server
-            base_out = 4000000  # 4 MB/s average
+                metrics[instance_id] = cached
+        
+        if missing:
+            try:
+                datapoints = self._get_metric_data_batch(missing, _ALL_METRICS, hours, statistics)
+            except (_session.BotoCoreError, _session.ClientError) as e:
+                raise CloudWatchError(f"Error fetching all metrics: {e}") from e
+            
+            for instance_id in missing:
+                metrics[instance_id] = self._cache_put(
+                    self._cache_key('all', instance_id, hours, statistics),
+                    self._all_metrics_from_datapoints(instance_id, hours, datapoints[instance_id], statistics)
+                )
+        
+        return metrics
+    
+    def _all_metrics_from_datapoints(self, instance_id: str, hours: int,
+                                     datapoints: Dict[str, List[Dict[str, Any]]],
+                                     statistics: Sequence[str]) -> Dict[str, Any]:
+        """Format one instance's _get_metric_data_batch output as a get_all_metrics result."""
+        return self._metrics_payload(
+            instance_id,
+            hours,
+            self._format_datapoints(datapoints['CPUUtilization'], 'Percent', statistics),
+            {
+                'network_in': self._format_datapoints(datapoints['NetworkIn'], 'Bytes', statistics),
+                'network_out': self._format_datapoints(datapoints['NetworkOut'], 'Bytes', statistics)
+            },
+            {
+                'disk_read': self._format_datapoints(datapoints['DiskReadBytes'], 'Bytes', statistics),
+                'disk_write': self._format_datapoints(datapoints['DiskWriteBytes'], 'Bytes', statistics)
+            }
+        )
+    
+    def _metrics_payload(self, instance_id: str, hours: int, cpu_data: Dict[str, Any],
+                         network_data: Dict[str, Any], disk_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble the get_all_metrics response from its formatted series."""
+        return {
+            'cpu': cpu_data,
+            'network': network_data,
+            'disk': disk_data,
+            'timestamp': datetime.utcnow(),
+            'instance_id': instance_id,
+            'duration_hours': hours
+        }
+    
+    def _get_metric_data_batch(self, instance_ids: Sequence[str], metric_names: Sequence[str],
+                               hours: int = 1, statistics: Sequence[str] = ('Average',)
+                               ) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Fetch the requested statistics for several EC2 metrics and instances at once.
         
-        for i in range(hours * 12):
-            timestamp = now - timedelta(minutes=5 * i)
+        Args:
+            instance_ids: EC2 instance IDs
+            metric_names: AWS/EC2 metric names to fetch
+            hours: Number of hours to look back
+            statistics: CloudWatch statistics to fetch, one query each
             
-            if base_in == 0:
-                in_value = 0
-                out_value = 0
-            else:
-                in_variation = random.uniform(0.5, 1.5)
-                out_variation = random.uniform(0.5, 1.5)
-                in_value = int(base_in * in_variation)
-                out_value = int(base_out * out_variation)
-            
-            network_in.append({
-                'timestamp': timestamp.isoformat(),
-                'average': in_value,
-                'maximum': int(in_value * 1.2),
-                'minimum': int(in_value * 0.8)
-            })
-            
-            network_out.append({
-                'timestamp': timestamp.isoformat(),
-                'average': out_value,
-                'maximum': int(out_value * 1.2),
-                'minimum': int(out_value * 0.8)
-            })
+        Returns:
+            Dictionary mapping instance ID to metric name to datapoints
+            shaped like GetMetricStatistics output ({'Timestamp', 'Average', ...})
+        """
+        start_time, end_time, period = _time_window(hours)
+        
+        specs = [
+            (instance_id, metric_name, stat)
+            for instance_id in instance_ids
+            for metric_name in metric_names
+            for stat in statistics
+        ]
+        queries = [
+            self._metric_query(f'm{i}', instance_id, metric_name, stat, period)
+            for i, (instance_id, metric_name, stat) in enumerate(specs)
+        ]
+        results = self._get_metric_data(queries, start_time, end_time)
+        
+        # Regroup the per-statistic series into one datapoint per timestamp
+        by_instance = {
+            instance_id: {metric_name: {} for metric_name in metric_names}
+            for instance_id in instance_ids
+        }
+        for i, (instance_id, metric_name, stat) in enumerate(specs):
+            result = results.get(f'm{i}', {'Timestamps': [], 'Values': []})
+            points = by_instance[instance_id][metric_name]
+            for timestamp, value in zip(result['Timestamps'], result['Values']):
+                points.setdefault(timestamp, {'Timestamp': timestamp})[stat] = value
         
         return {
-            'network_in': network_in[::-1],
-            'network_out': network_out[::-1]
+            instance_id: {metric_name: list(points.values()) for metric_name, points in by_metric.items()}
+            for instance_id, by_metric in by_instance.items()
         }
 
-    def _get_demo_disk_data(self, instance_id: str, hours: int = 1) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate demo disk data."""
-        disk_read = []
-        disk_write = []
-        now = datetime.utcnow()
-        
-        # Different disk patterns based on instance type
-        if 'database' in instance_id.lower() or '0987654321' in instance_id:
-            base_read = 2000000   # 2 MB/s average
-            base_write = 1500000  # 1.5 MB/s average
-        elif 'backup' in instance_id.lower() or 'abcdef' in instance_id:
-            base_read = 0
-            base_write = 0
-        else:
-            base_read = 1000000   # 1 MB/s average
-            base_write = 800000   # 0.8 MB/s average
+    def _demo_timestamps(self, hours: int) -> Tuple[datetime, ...]:
+        """
+        Timestamps for demo datapoints, oldest first.
         
-        for i in range(hours * 12):
-            timestamp = now - timedelta(minutes=5 * i)
-            
-            if base_read == 0:
-                read_value = 0
-                write_value = 0
-            else:
-                read_variation = random.uniform(0.5, 1.5)
-                write_variation = random.uniform(0.5, 1.5)
-                read_value = int(base_read * read_variation)
-                write_value = int(base_write * write_variation)
-            
-            disk_read.append({
-                'timestamp': timestamp.isoformat(),
-                'average': read_value,
-                'maximum': int(read_value * 1.3),
-                'minimum': int(read_value * 0.7)
-            })
-            
-            disk_write.append({
-                'timestamp': timestamp.isoformat(),
-                'average': write_value,
-                'maximum': int(write_value * 1.3),
-                'minimum': int(write_value * 0.7)
-            })
+        Demo series use the same aligned window and period as real queries,
+        so long windows produce a bounded number of points. The grid is
+        shared by every demo series of the same window.
+        """
+        return _demo_grid(*_time_window(hours))
+    
+    def _get_demo_cpu_data(self, instance_id: str, hours: int = 1,
+                           statistics: Sequence[str] = ('Average',)) -> Dict[str, Any]:
+        """Generate a demo CPU utilization series."""
+        timestamps = self._demo_timestamps(hours)
+        base_cpu = _demo_profile(instance_id)['cpu']
+        
+        if base_cpu == 0.0:
+            averages = [0.0] * len(timestamps)
+        else:
+            # Add some realistic variation
+            averages = [max(0, min(100, base_cpu + random.uniform(-10, 15))) for _ in timestamps]
         
+        return self._demo_series(timestamps, averages, hours, statistics, 0.1, 'Percent')
+
+    def _get_demo_network_data(self, instance_id: str, hours: int = 1,
+                               statistics: Sequence[str] = ('Average',)) -> Dict[str, Dict[str, Any]]:
+        """Generate demo network series."""
+        profile = _demo_profile(instance_id)
+        timestamps = self._demo_timestamps(hours)
+        return {
+            'network_in': self._demo_bytes_series(timestamps, hours, profile['network_in'], 0.2, statistics),
+            'network_out': self._demo_bytes_series(timestamps, hours, profile['network_out'], 0.2, statistics)
+        }
+
+    def _get_demo_disk_data(self, instance_id: str, hours: int = 1,
+                            statistics: Sequence[str] = ('Average',)) -> Dict[str, Dict[str, Any]]:
+        """Generate demo disk series."""
+        profile = _demo_profile(instance_id)
+        timestamps = self._demo_timestamps(hours)
         return {
-            'disk_read': disk_read[::-1],
-            'disk_write': disk_write[::-1]
+            'disk_read': self._demo_bytes_series(timestamps, hours, profile['disk_read'], 0.3, statistics),
+            'disk_write': self._demo_bytes_series(timestamps, hours, profile['disk_write'], 0.3, statistics)
         }
     
-    def get_metric_alarms(self, instance_id: str) -> List[Dict[str, Any]]:
+    def _demo_bytes_series(self, timestamps: Sequence[datetime], hours: int, base: int, spread: float,
+                           statistics: Sequence[str]) -> Dict[str, Any]:
         """
-        Get CloudWatch alarms associated with an instance.
+        Generate a demo byte-count series around base.
         
         Args:
-            instance_id: The EC2 instance ID
+            timestamps: Timestamps of the series
+            hours: Look-back window the timestamps cover
+            base: Typical average value, 0 for an idle instance
+            spread: Fraction the maximum and minimum sit above and below the average
+            statistics: Statistics to include
             
         Returns:
-            List of alarm information
+            Series dictionary in the same layout as _format_datapoints
         """
-        try:
-            response = self.client.describe_alarms(
-                AlarmNamePrefix=f"*{instance_id}*"
-            )
-            
-            alarms = []
-            for alarm in response['MetricAlarms']:
-                alarm_info = {
-                    'alarm_name': alarm['AlarmName'],
-                    'alarm_arn': alarm['AlarmArn'],
-                    'state': alarm['StateValue'],
-                    'state_reason': alarm.get('StateReason', 'N/A'),
-                    'metric_name': alarm['MetricName'],
-                    'namespace': alarm['Namespace'],
-                    'threshold': alarm['Threshold'],
-                    'comparison_operator': alarm['ComparisonOperator'],
-                    'evaluation_periods': alarm['EvaluationPeriods'],
-                    'period': alarm['Period']
-                }
-                alarms.append(alarm_info)
-            
-            return alarms
-            
-        except ClientError as e:
-            # If no alarms found, return empty list
-            if 'NoSuchEntity' in str(e):
-                return []
-            raise Exception(f"Error fetching alarms: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
-    
-    def _format_cpu_data(self, datapoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """
-        Format CPU utilization datapoints.
+        if base == 0:
+            averages = [0] * len(timestamps)
+        else:
+            averages = [base * random.uniform(0.5, 1.5) for _ in timestamps]
+        
+        return self._demo_series(timestamps, averages, hours, statistics, spread, 'Bytes')
+    
+    def _demo_series(self, timestamps: Sequence[datetime], averages: List[float], hours: int,
+                     statistics: Sequence[str], spread: float, unit: str) -> Dict[str, Any]:
+        """
+        Build a demo series with exactly the requested statistic columns.
+        
+        Maximums and minimums sit up to spread above and below each average;
+        sums and sample counts assume one sample per minute of the period, as
+        detailed monitoring would report.
         
         Args:
-            datapoints: Raw datapoints from CloudWatch
+            timestamps: Timestamps of the series
+            averages: Average value per timestamp
+            hours: Look-back window, used to find the datapoint period
+            statistics: Statistics to include, e.g. 'Sum' as 'sums'
+            spread: Largest fraction maximums and minimums differ from the average
+            unit: Series unit
             
         Returns:
-            Formatted CPU data
+            Series dictionary in the same layout as _format_datapoints
         """
-        formatted_data = []
+        samples = _pick_period(hours) // 60
         
-        for dp in sorted(datapoints, key=lambda x: x['Timestamp']):
-            formatted_data.append({
-                'timestamp': dp['Timestamp'].isoformat(),
-                'average': dp.get('Average', 0),
-                'maximum': dp.get('Maximum', 0),
-                'minimum': dp.get('Minimum', 0),
-                'unit': dp.get('Unit', 'Percent')
-            })
+        series = {'timestamps': timestamps}
+        for stat in statistics:
+            if stat == 'Maximum':
+                values = [value * (1 + random.uniform(0, spread)) for value in averages]
+            elif stat == 'Minimum':
+                values = [value * (1 - random.uniform(0, spread)) for value in averages]
+            elif stat == 'Sum':
+                values = [value * samples for value in averages]
+            elif stat == 'SampleCount':
+                values = [samples] * len(averages)
+            else:
+                values = averages
+            series[_STAT_COLUMNS[stat]] = [round(value, 2) for value in values]
+        series['unit'] = unit
         
-        return formatted_data
+        return series
     
-    def _format_network_data(self, datapoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def get_metric_alarms(self, instance_id: str) -> List[Dict[str, Any]]:
         """
-        Format network metrics datapoints.
+        Get CloudWatch alarms associated with an instance.
+        
+        Alarms are looked up server-side with DescribeAlarmsForMetric for
+        each of the standard EC2 metrics in _ALARM_METRICS, so a fixed,
+        small number of requests returns only alarms watching the
+        instance's InstanceId dimension. Results are cached per instance
+        for the service's cache TTL.
         
         Args:
-            datapoints: Raw datapoints from CloudWatch
+            instance_id: The EC2 instance ID
             
         Returns:
-            Formatted network data
+            List of alarm information
         """
-        formatted_data = []
+        if self.demo_mode:
+            return []
+        
+        def alarms_for_metric(metric_name):
+            return self.client.describe_alarms_for_metric(
+                MetricName=metric_name,
+                Namespace=self._NAMESPACE,
+                Dimensions=self._dims(instance_id)
+            )['MetricAlarms']
         
-        for dp in sorted(datapoints, key=lambda x: x['Timestamp']):
-            formatted_data.append({
-                'timestamp': dp['Timestamp'].isoformat(),
-                'average': dp.get('Average', 0),
-                'maximum': dp.get('Maximum', 0),
-                'minimum': dp.get('Minimum', 0),
-                'unit': dp.get('Unit', 'Bytes')
-            })
+        def fetch():
+            futures = [submit(alarms_for_metric, name) for name in _ALARM_METRICS]
+            
+            # Keyed by ARN in case an alarm is returned for more than one metric
+            alarms = {}
+            for future in futures:
+                for alarm in future.result():
+                    alarms.setdefault(alarm['AlarmArn'], {
+                        'alarm_name': alarm['AlarmName'],
+                        'alarm_arn': alarm['AlarmArn'],
+                        'state': alarm['StateValue'],
+                        'state_reason': alarm.get('StateReason', 'N/A'),
+                        'metric_name': alarm.get('MetricName', 'N/A'),
+                        'namespace': alarm.get('Namespace', 'N/A'),
+                        'threshold': alarm['Threshold'],
+                        'comparison_operator': alarm['ComparisonOperator'],
+                        'evaluation_periods': alarm['EvaluationPeriods'],
+                        'period': alarm.get('Period')
+                    })
+            
+            return list(alarms.values())
         
-        return formatted_data
+        try:
+            return self._cached(('alarms', instance_id), fetch, self._alarms_cache)
+            
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise CloudWatchError(f"Error fetching alarms: {e}") from e
     
-    def _format_disk_data(self, datapoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _format_datapoints(self, datapoints: List[Dict[str, Any]], default_unit: str = 'None',
+                           statistics: Sequence[str] = ('Average',)) -> Dict[str, Any]:
         """
-        Format disk metrics datapoints.
+        Format metric datapoints as parallel columns, oldest first.
         
         Args:
-            datapoints: Raw datapoints from CloudWatch
+            datapoints: Raw datapoints from CloudWatch, sorted in place
+            default_unit: Unit to report when the datapoints carry none
+            statistics: Statistics to include, e.g. 'Average' as 'averages'
             
         Returns:
-            Formatted disk data
+            Dictionary with a 'timestamps' list of datetimes, one list per
+            statistic and the series 'unit'
         """
-        formatted_data = []
+        datapoints.sort(key=itemgetter('Timestamp'))
         
-        for dp in sorted(datapoints, key=lambda x: x['Timestamp']):
-            formatted_data.append({
-                'timestamp': dp['Timestamp'].isoformat(),
-                'average': dp.get('Average', 0),
-                'maximum': dp.get('Maximum', 0),
-                'minimum': dp.get('Minimum', 0),
-                'unit': dp.get('Unit', 'Bytes')
-            })
+        # Timestamps stay datetimes; orjson encodes them at the HTTP boundary
+        series = {'timestamps': [dp['Timestamp'] for dp in datapoints]}
+        for stat in statistics:
+            series[_STAT_COLUMNS[stat]] = [dp.get(stat, 0) for dp in datapoints]
+        series['unit'] = datapoints[0].get('Unit', default_unit) if datapoints else default_unit
         
-        return formatted_data
+        return series
     
     def get_available_metrics(self, instance_id: str) -> List[str]:
         """
         Get list of available metrics for an instance.
         
+        The metric set only changes when monitoring settings change, so
+        results are cached per instance for ten minutes.
+        
         Args:
             instance_id: The EC2 instance ID
             
         Returns:
             List of available metric names
         """
-        try:
-            response = self.client.list_metrics(
-                Namespace='AWS/EC2',
-                Dimensions=[
-                    {
-                        'Name': 'InstanceId',
-                        'Value': instance_id
-                    }
-                ]
+        if self.demo_mode:
+            return list(_ALL_METRICS)
+        
+        def fetch():
+            paginator = self.client.get_paginator('list_metrics')
+            pages = paginator.paginate(
+                Namespace=self._NAMESPACE,
+                Dimensions=self._dims(instance_id)
             )
             
-            return [metric['MetricName'] for metric in response['Metrics']]
+            # Preserve CloudWatch's order while dropping repeated names
+            return list(dict.fromkeys(
+                metric['MetricName'] for page in pages for metric in page['Metrics']
+            ))
+        
+        try:
+            return self._cached(('available', instance_id), fetch, self._available_metrics_cache)
             
-        except ClientError as e:
-            raise Exception(f"Error fetching available metrics: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise CloudWatchError(f"Error fetching available metrics: {e}") from e
     
-    def get_custom_metric(self, instance_id: str, metric_name: str, hours: int = 1) -> List[Dict[str, Any]]:
+    def get_custom_metric(self, instance_id: str, metric_name: str, hours: int = 1,
+                          statistics: Sequence[str] = ('Average',)) -> Dict[str, Any]:
         """
         Get a custom metric for an instance.
         
@@ -490,31 +789,128 @@ class CloudWatchService:
             instance_id: The EC2 instance ID
             metric_name: Name of the metric to fetch
             hours: Number of hours to look back
+            statistics: CloudWatch statistics to fetch
             
         Returns:
-            List of metric datapoints
+            Metric series
         """
-        try:
-            start_time, end_time = get_time_range(hours)
-            
-            response = self.client.get_metric_statistics(
-                Namespace='AWS/EC2',
-                MetricName=metric_name,
-                Dimensions=[
-                    {
-                        'Name': 'InstanceId',
-                        'Value': instance_id
-                    }
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=300,
-                Statistics=['Average', 'Maximum', 'Minimum']
+        statistics = tuple(statistics)
+        
+        def fetch():
+            datapoints = self._get_metric_data_batch([instance_id], [metric_name], hours, statistics)
+            return self._format_datapoints(
+                datapoints[instance_id][metric_name],
+                _EC2_METRIC_UNITS.get(metric_name, 'None'),
+                statistics
             )
+        
+        try:
+            return self._cached(self._cache_key('custom', instance_id, hours, metric_name, statistics), fetch)
             
-            return self._format_cpu_data(response['Datapoints'])  # Reuse CPU format
-            
-        except ClientError as e:
-            raise Exception(f"Error fetching custom metric {metric_name}: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}") 
\ No newline at end of file
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise CloudWatchError(f"Error fetching custom metric {metric_name}: {e}") from e 
+
+
+@lru_cache(maxsize=16)
+def _demo_grid(start_time: datetime, end_time: datetime, period: int) -> Tuple[datetime, ...]:
+    """Build the timestamps of a demo series window once; see _demo_timestamps."""
+    step = timedelta(seconds=period)
+    count = int((end_time - start_time) / step)
+    return tuple(start_time + step * i for i in range(count))
+
+
+@lru_cache(maxsize=256)
+def _demo_profile(instance_id: str) -> Dict[str, float]:
+    """Pick the demo load profile for an instance, once per instance ID."""
+    instance_id_lower = instance_id.lower()
+    if 'database' in instance_id_lower or '0987654321' in instance_id:
+        return _DEMO_PROFILES['database']
+    if 'backup' in instance_id_lower or 'abcdef' in instance_id:
+        return _DEMO_PROFILES['backup']
+    return _DEMO_PROFILES['default']
+
+
+def to_rows(series: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Convert a columnar metric series to one dictionary per datapoint.
+    
+    For consumers that want the older row layout, e.g.
+    {'timestamps': [t], 'averages': [v], 'unit': 'Percent'} becomes
+    [{'timestamp': t, 'average': v, 'unit': 'Percent'}].
+    
+    Args:
+        series: Series dictionary as returned by the metric getters
+        
+    Returns:
+        List of datapoint dictionaries, oldest first
+    """
+    columns = {
+        _ROW_KEYS[name]: values
+        for name, values in series.items()
+        if name in _ROW_KEYS
+    }
+    return [
+        dict(zip(columns, values), unit=series['unit'])
+        for values in zip(*columns.values())
+    ]
+
+
+def _pick_period(hours: int) -> int:
+    """
+    Choose the datapoint period for a look-back window.
+    
+    Keeps each series to roughly 100 points or fewer: 5-minute datapoints
+    up to 6 hours, hourly up to 2 days and daily beyond that.
+    
+    Args:
+        hours: Number of hours to look back
+        
+    Returns:
+        Period in seconds
+    """
+    if hours <= 6:
+        return 300
+    if hours <= 48:
+        return 3600
+    return 86400
+
+
+def _alignment(period: int) -> int:
+    """Seconds to align a window's end to; capped at an hour so daily views still include today."""
+    return min(period, 3600)
+
+
+def _time_window(hours: int) -> tuple:
+    """
+    Get the aligned time range and datapoint period for a metric query.
+    
+    Args:
+        hours: Number of hours to look back
+        
+    Returns:
+        Tuple of (start_time, end_time, period)
+    """
+    period = _pick_period(hours)
+    start_time, end_time = get_time_range(hours, _alignment(period))
+    return start_time, end_time, period
+
+
+@lru_cache(maxsize=32)
+def get_cloudwatch_service(region_name: str = 'us-east-1') -> CloudWatchService:
+    """
+    Get the CloudWatchService for a region, creating it on first use.
+    
+    Metric and alarm results are cached for Config.CLOUDWATCH_CACHE_TTL.
+    
+    Args:
+        region_name: AWS region name
+        
+    Returns:
+        CloudWatchService instance for the region
+        
+    Raises:
+        ValueError: If the region is not supported
+    """
+    # Checked first so unknown names never take a slot in the cache
+    check_region(region_name)
+    return CloudWatchService(region_name, cache_ttl=Config.CLOUDWATCH_CACHE_TTL)
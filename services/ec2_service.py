@@ -2,71 +2,346 @@
 EC2 service module for AWS Diagnostic Tool.
 Handles all EC2-related operations using Boto3.
 """
-import boto3
-from typing import Dict, List, Any, Optional
-from botocore.exceptions import ClientError, NoCredentialsError
+import threading
+from collections import Counter
+import time
+from functools import cached_property, lru_cache
+from operator import itemgetter
+from typing import Dict, Iterator, List, Any, NamedTuple, Optional, TypedDict
 from datetime import datetime, timedelta
-from utils.helpers import format_datetime, parse_instance_tags, get_instance_name
+from services import _session
+from services._session import check_region, get_client, has_credentials
+from services.cloudwatch_service import CloudWatchError, get_cloudwatch_service
+from utils.cache import ttl_cached
+from utils.helpers import AlertStatus, format_datetime, parse_instance_tags, calculate_alert_status
+
+
+# Fields every DescribeInstances instance carries, fetched in one C-level call
+_REQUIRED_FIELDS = itemgetter('InstanceId', 'InstanceType', 'State', 'LaunchTime')
+
+
+# Alert statuses for instances without a CPU reading; immutable, so shared
+_NOT_RUNNING = AlertStatus(False, 'none', 'Instance not running')
+_NO_CPU_RESULT = AlertStatus(False, 'none', 'Error fetching CPU data')
+_NO_CPU_DATA = AlertStatus(False, 'none', 'No CPU data available')
+
+
+class EC2Error(Exception):
+    """Raised when an EC2 request fails; the botocore error is chained as __cause__."""
+
+
+class SecurityGroupRecord(TypedDict):
+    """Security group attached to a formatted instance."""
+    group_id: str
+    group_name: str
+
+
+class BlockDeviceRecord(TypedDict):
+    """Block device mapping of a formatted instance."""
+    device_name: str
+    volume_id: str
+    delete_on_termination: bool
+
+
+class InstanceRecord(TypedDict):
+    """
+    Instance as returned by _format_instance_data.
+    
+    Records stay plain dicts so templates, the orjson endpoints and the
+    {**instance, ...} status merge use them unchanged; the TypedDict only
+    documents and type-checks the schema and costs nothing at runtime.
+    """
+    instance_id: str
+    name: str
+    instance_type: str
+    state: str
+    launch_time: str
+    launch_time_raw: datetime
+    public_ip: str
+    private_ip: str
+    vpc_id: str
+    subnet_id: str
+    availability_zone: str
+    platform: str
+    architecture: str
+    tags: Dict[str, str]
+    security_groups: List[SecurityGroupRecord]
+    block_devices: List[BlockDeviceRecord]
+    monitoring: str
+    iam_instance_profile: str
+
+
+class _InstanceSnapshot(NamedTuple):
+    """
+    One DescribeInstances result with per-field columns in the same order.
+    
+    The columns are extracted once per refresh, so filters and summaries scan
+    flat lists instead of looking the field up in every instance dict.
+    """
+    instances: List[Dict[str, Any]]
+    names_lower: List[str]
+    states: List[str]
+    instance_types: List[str]
+    
+    @classmethod
+    def build(cls, instances: List[Dict[str, Any]]) -> '_InstanceSnapshot':
+        """Extract the filter and summary columns from a formatted instance list."""
+        return cls(
+            instances,
+            [instance['name'].lower() for instance in instances],
+            list(map(itemgetter('state'), instances)),
+            list(map(itemgetter('instance_type'), instances))
+        )
 
 
 class EC2Service:
     """Service class for EC2 operations."""
     
-    def __init__(self, region_name: str = 'us-east-1'):
+    # Default seconds to reuse a DescribeInstances result across endpoints
+    INSTANCE_CACHE_TTL = 120
+    
+    # Seconds to reuse a single-instance lookup
+    INSTANCE_LOOKUP_TTL = 30
+    
+    def __init__(self, region_name: str = 'us-east-1', cache_ttl: Optional[float] = None):
         """
         Initialize EC2 service with specified region.
         
         Args:
             region_name: AWS region name
+            cache_ttl: Seconds to reuse the instance list; defaults to
+                INSTANCE_CACHE_TTL
         """
         self.region_name = region_name
-        self.demo_mode = False
+        self.cache_ttl = self.INSTANCE_CACHE_TTL if cache_ttl is None else cache_ttl
         
-        try:
-            self.client = boto3.client('ec2', region_name=region_name)
-            self.resource = boto3.resource('ec2', region_name=region_name)
-            # Test credentials by making a simple call
-            self.client.describe_regions()
-        except (NoCredentialsError, ClientError):
-            self.demo_mode = True
-            print("⚠️  AWS credentials not found or invalid. Running in DEMO MODE with sample data.")
+        # Last DescribeInstances result, shared by every endpoint in the region
+        self._instances_cache = None
+        self._instances_cache_time = 0.0
+        self._instances_lock = threading.Lock()
+        
+        # Instances annotated with CPU alert status, shared by all dashboard views
+        self._status_cache = None
+        self._status_cache_time = 0.0
+        self._status_lock = threading.Lock()
     
-    def get_all_instances(self) -> List[Dict[str, Any]]:
+    @cached_property
+    def demo_mode(self) -> bool:
+        """Whether to serve sample data, decided on first use so creating the service stays free of boto3."""
+        # Checked locally; invalid credentials surface as EC2Error on use
+        if has_credentials():
+            return False
+        print("⚠️  AWS credentials not found. Running in DEMO MODE with sample data.")
+        return True
+    
+    @cached_property
+    def client(self):
+        """Shared EC2 client for the region, created on first use."""
+        return get_client('ec2', self.region_name)
+    
+    def get_all_instances(self, filters: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """
         Get all EC2 instances in the region.
         
+        Unfiltered results are reused for cache_ttl seconds, so the dashboard
+        and its AJAX calls share one DescribeInstances round trip. Callers
+        must treat the returned dictionaries as read-only.
+        
+        Args:
+            filters: Optional DescribeInstances filters, applied server-side;
+                filtered calls bypass the cache (ignored in demo mode)
+        
+        Returns:
+            List of instance dictionaries with metadata
+        """
+        if filters:
+            return list(self.iter_instances(filters=filters))
+        return self._get_instances_snapshot().instances
+    
+    def invalidate_cache(self) -> None:
+        """Drop the cached instance list, status annotations and instance lookups."""
+        with self._instances_lock:
+            self._instances_cache = None
+        with self._status_lock:
+            self._status_cache = None
+        EC2Service.get_instance_by_id.cache_clear(self)
+    
+    def refresh(self) -> List[Dict[str, Any]]:
+        """
+        Re-fetch the instance list now, bypassing the cache.
+        
+        Returns:
+            List of instance dictionaries with metadata
+        """
+        self.invalidate_cache()
+        return self.get_all_instances()
+    
+    def _get_instances_snapshot(self) -> _InstanceSnapshot:
+        """
+        Get the cached instance list with its columns, refreshing if stale.
+        
+        Returns:
+            Snapshot of the region's instances
+        """
+        with self._instances_lock:
+            if (self._instances_cache is not None
+                    and time.monotonic() - self._instances_cache_time < self.cache_ttl):
+                return self._instances_cache
+            
+            instances = self._describe_all_instances()
+            self._instances_cache = _InstanceSnapshot.build(instances)
+            self._instances_cache_time = time.monotonic()
+            return self._instances_cache
+    
+    def _fresh_snapshot(self) -> Optional[_InstanceSnapshot]:
+        """Return the cached instance snapshot if it is still fresh, without refreshing it."""
+        with self._instances_lock:
+            if (self._instances_cache is not None
+                    and time.monotonic() - self._instances_cache_time < self.cache_ttl):
+                return self._instances_cache
+            return None
+    
+    def filter_instances(self, state: str = '', instance_type: str = '',
+                         name_pattern: str = '') -> List[Dict[str, Any]]:
+        """
+        Filter instances by state, instance type and name substring.
+        
+        Lowercased names, states and types are extracted once per
+        DescribeInstances snapshot, so filtering does no per-request string
+        allocation or dict lookups for rejected instances. EC2 reports
+        states and instance types in lowercase already.
+        
+        Args:
+            state: Exact instance state, case-insensitive
+            instance_type: Instance type substring, case-insensitive
+            name_pattern: Name substring, case-insensitive
+            
+        Returns:
+            List of matching instances
+        """
+        snapshot = self._get_instances_snapshot()
+        if not (state or instance_type or name_pattern):
+            return snapshot.instances
+        
+        state = state.lower()
+        instance_type = instance_type.lower()
+        name_pattern = name_pattern.lower()
+        
+        return [
+            instance
+            for instance, name_lower, instance_state, type_name in zip(
+                snapshot.instances, snapshot.names_lower, snapshot.states, snapshot.instance_types
+            )
+            if (not state or instance_state == state)
+            and (not instance_type or instance_type in type_name)
+            and (not name_pattern or name_pattern in name_lower)
+        ]
+    
+    def _describe_all_instances(self) -> List[InstanceRecord]:
+        """
+        Fetch and format all EC2 instances in the region from the API.
+        
         Returns:
             List of instance dictionaries with metadata
         """
         if self.demo_mode:
-            return self._get_demo_instances()
+            return self._demo_instances
+        
+        return list(self.iter_instances())
+    
+    def iter_instances(self, filters: Optional[List[Dict[str, Any]]] = None) -> Iterator[InstanceRecord]:
+        """
+        Yield every EC2 instance in the region straight from the API.
+        
+        DescribeInstances is paginated 1000 instances per page, so accounts
+        with more instances than one response holds are listed completely.
+        Unlike get_all_instances this bypasses the cache.
+        
+        Args:
+            filters: Optional DescribeInstances filters, applied server-side
+                (ignored in demo mode)
+            
+        Yields:
+            Instance dictionaries with metadata
+        """
+        if self.demo_mode:
+            yield from self._demo_instances
+            return
             
         try:
-            response = self.client.describe_instances()
-            instances = []
+            paginator = self.client.get_paginator('describe_instances')
+            pages = paginator.paginate(Filters=filters or [], PaginationConfig={'PageSize': 1000})
+            for page in pages:
+                for reservation in page['Reservations']:
+                    for instance in reservation['Instances']:
+                        yield self._format_instance_data(instance)
             
-            for reservation in response['Reservations']:
-                for instance in reservation['Instances']:
-                    instance_data = self._format_instance_data(instance)
-                    instances.append(instance_data)
+        except _session.NoCredentialsError as e:
+            raise EC2Error("AWS credentials not found. Please configure your credentials.") from e
+        except _session.ClientError as e:
+            if e.response['Error']['Code'] == 'UnauthorizedOperation':
+                raise EC2Error("Insufficient permissions to describe EC2 instances.") from e
+            raise EC2Error(f"AWS API error: {e}") from e
+        except _session.BotoCoreError as e:
+            raise EC2Error(f"AWS API error: {e}") from e
+    
+    def get_all_instances_with_status(self, ttl: int = 30) -> List[Dict[str, Any]]:
+        """
+        Get all instances annotated with current CPU and alert status.
+        
+        The latest CPU utilization of all running instances is fetched from
+        CloudWatch in one batched request. The annotated list is cached for
+        ttl seconds so the dashboard, instance and alert endpoints share one
+        refresh.
+        Callers must treat the returned dictionaries as read-only.
+        
+        Args:
+            ttl: Seconds to reuse the annotated list
             
-            return instances
+        Returns:
+            List of instance dictionaries with 'alert_status' and 'current_cpu'
+        """
+        with self._status_lock:
+            if self._status_cache is not None and time.monotonic() - self._status_cache_time < ttl:
+                return self._status_cache
             
-        except NoCredentialsError:
-            raise Exception("AWS credentials not found. Please configure your credentials.")
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            if error_code == 'UnauthorizedOperation':
-                raise Exception("Insufficient permissions to describe EC2 instances.")
-            else:
-                raise Exception(f"AWS API error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+            instances = self.get_all_instances()
+            running_ids = [i['instance_id'] for i in instances if i['state'] == 'running']
+            try:
+                cpu_results = get_cloudwatch_service(self.region_name).get_cpu_batch(running_ids) if running_ids else {}
+            except CloudWatchError:
+                # CloudWatch being unavailable should not hide the instance list
+                cpu_results = {}
+            
+            annotated = []
+            for instance in instances:
+                if instance['state'] != 'running':
+                    alert_status = _NOT_RUNNING
+                    current_cpu = 0
+                elif instance['instance_id'] not in cpu_results:
+                    alert_status = _NO_CPU_RESULT
+                    current_cpu = 0
+                elif cpu_results[instance['instance_id']] is None:
+                    alert_status = _NO_CPU_DATA
+                    current_cpu = 0
+                else:
+                    current_cpu = cpu_results[instance['instance_id']]
+                    alert_status = calculate_alert_status(current_cpu)
+                
+                annotated.append(dict(instance, alert_status=alert_status, current_cpu=current_cpu))
+            
+            self._status_cache = annotated
+            self._status_cache_time = time.monotonic()
+            return annotated
     
+    @ttl_cached(INSTANCE_LOOKUP_TTL)
     def get_instance_by_id(self, instance_id: str) -> Optional[Dict[str, Any]]:
         """
         Get specific EC2 instance by ID.
         
+        Lookups are cached for INSTANCE_LOOKUP_TTL seconds, so the detail
+        page and its API calls share one DescribeInstances request.
+        
         Args:
             instance_id: The EC2 instance ID
             
@@ -74,11 +349,7 @@ class EC2Service:
             Instance dictionary or None if not found
         """
         if self.demo_mode:
-            demo_instances = self._get_demo_instances()
-            for instance in demo_instances:
-                if instance['instance_id'] == instance_id:
-                    return instance
-            return None
+            return self._demo_by_id.get(instance_id)
             
         try:
             response = self.client.describe_instances(
@@ -91,14 +362,13 @@ class EC2Service:
             
             return None
             
-        except ClientError as e:
+        except _session.ClientError as e:
             error_code = e.response['Error']['Code']
             if error_code == 'InvalidInstanceID.NotFound':
                 return None
-            else:
-                raise Exception(f"AWS API error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+            raise EC2Error(f"AWS API error: {e}") from e
+        except _session.BotoCoreError as e:
+            raise EC2Error(f"AWS API error: {e}") from e
     
     def get_instance_status(self, instance_id: str) -> Dict[str, Any]:
         """
@@ -108,41 +378,60 @@ class EC2Service:
             instance_id: The EC2 instance ID
             
         Returns:
-            Dictionary with status information
+            Dictionary with status information, empty if none was reported
+        """
+        return self.get_instance_statuses([instance_id]).get(instance_id, {})
+    
+    def get_instance_statuses(self, instance_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get detailed status information for many instances.
+        
+        DescribeInstanceStatus accepts up to 100 instance IDs per request,
+        so N instances cost ceil(N / 100) round trips instead of N.
+        
+        Args:
+            instance_ids: EC2 instance IDs
+            
+        Returns:
+            Dictionary mapping each reported instance ID to its status information
         """
         if self.demo_mode:
             return {
-                'instance_id': instance_id,
-                'state': 'running',
-                'system_status': 'ok',
-                'instance_status': 'ok',
-                'system_status_details': [],
-                'instance_status_details': []
+                instance_id: {
+                    'instance_id': instance_id,
+                    'state': 'running',
+                    'system_status': 'ok',
+                    'instance_status': 'ok',
+                    'system_status_details': [],
+                    'instance_status_details': []
+                }
+                for instance_id in instance_ids
             }
             
         try:
-            response = self.client.describe_instance_status(
-                InstanceIds=[instance_id],
-                IncludeAllInstances=True
-            )
+            paginator = self.client.get_paginator('describe_instance_status')
             
-            if response['InstanceStatuses']:
-                status = response['InstanceStatuses'][0]
-                return {
-                    'instance_id': status['InstanceId'],
-                    'state': status['InstanceState']['Name'],
-                    'system_status': status['SystemStatus']['Status'],
-                    'instance_status': status['InstanceStatus']['Status'],
-                    'system_status_details': status['SystemStatus'].get('Details', []),
-                    'instance_status_details': status['InstanceStatus'].get('Details', [])
-                }
+            statuses = {}
+            for start in range(0, len(instance_ids), 100):
+                pages = paginator.paginate(
+                    InstanceIds=instance_ids[start:start + 100],
+                    IncludeAllInstances=True
+                )
+                for page in pages:
+                    for status in page['InstanceStatuses']:
+                        statuses[status['InstanceId']] = {
+                            'instance_id': status['InstanceId'],
+                            'state': status['InstanceState']['Name'],
+                            'system_status': status['SystemStatus']['Status'],
+                            'instance_status': status['InstanceStatus']['Status'],
+                            'system_status_details': status['SystemStatus'].get('Details', []),
+                            'instance_status_details': status['InstanceStatus'].get('Details', [])
+                        }
             
-            return {}
+            return statuses
             
-        except ClientError as e:
-            raise Exception(f"AWS API error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise EC2Error(f"AWS API error: {e}") from e
     
     def get_instance_console_output(self, instance_id: str) -> str:
         """
@@ -177,15 +466,25 @@ class EC2Service:
             
             return response.get('Output', 'No console output available')
             
-        except ClientError as e:
+        except _session.ClientError as e:
             error_code = e.response['Error']['Code']
             if error_code == 'InvalidInstanceID.NotFound':
                 return "Instance not found"
             else:
                 return f"Error retrieving console output: {str(e)}"
-        except Exception as e:
-            return f"Unexpected error: {str(e)}"
+        except _session.BotoCoreError as e:
+            return f"Error retrieving console output: {str(e)}"
 
+    @cached_property
+    def _demo_instances(self) -> List[Dict[str, Any]]:
+        """Demo instances, built once per service; callers must treat them as read-only."""
+        return self._get_demo_instances()
+    
+    @cached_property
+    def _demo_by_id(self) -> Dict[str, Dict[str, Any]]:
+        """Demo instances indexed by instance ID."""
+        return {instance['instance_id']: instance for instance in self._demo_instances}
+    
     def _get_demo_instances(self) -> List[Dict[str, Any]]:
         """
         Get demo instances for testing without AWS credentials.
@@ -267,7 +566,7 @@ class EC2Service:
         ]
         return demo_instances
     
-    def _format_instance_data(self, instance: Dict[str, Any]) -> Dict[str, Any]:
+    def _format_instance_data(self, instance: Dict[str, Any]) -> InstanceRecord:
         """
         Format raw instance data from AWS API.
         
@@ -278,22 +577,19 @@ class EC2Service:
             Formatted instance data
         """
         # Extract basic information
-        instance_id = instance['InstanceId']
-        instance_type = instance['InstanceType']
-        state = instance['State']['Name']
-        launch_time = instance['LaunchTime']
+        instance_id, instance_type, state, launch_time = _REQUIRED_FIELDS(instance)
+        state = state['Name']
         
         # Extract network information
         public_ip = instance.get('PublicIpAddress', 'N/A')
         private_ip = instance.get('PrivateIpAddress', 'N/A')
         
-        # Extract tags
-        tags = instance.get('Tags', [])
-        instance_name = get_instance_name(tags)
-        tag_dict = parse_instance_tags(tags)
+        # Extract tags, parsed once for both the name and the tag map
+        tag_dict = parse_instance_tags(instance.get('Tags'))
+        instance_name = tag_dict.get('Name', 'Unnamed Instance')
         
         # Extract security groups
-        security_groups = [
+        security_groups: List[SecurityGroupRecord] = [
             {
                 'group_id': sg['GroupId'],
                 'group_name': sg['GroupName']
@@ -302,14 +598,19 @@ class EC2Service:
         ]
         
         # Extract block device mappings
-        block_devices = []
+        block_devices: List[BlockDeviceRecord] = []
         for device in instance.get('BlockDeviceMappings', []):
+            ebs = device.get('Ebs')
             block_devices.append({
                 'device_name': device['DeviceName'],
-                'volume_id': device['Ebs']['VolumeId'] if 'Ebs' in device else 'N/A',
-                'delete_on_termination': device['Ebs'].get('DeleteOnTermination', False) if 'Ebs' in device else False
+                'volume_id': ebs['VolumeId'] if ebs is not None else 'N/A',
+                'delete_on_termination': ebs.get('DeleteOnTermination', False) if ebs is not None else False
             })
         
+        placement = instance.get('Placement') or {}
+        monitoring = instance.get('Monitoring') or {}
+        iam_profile = instance.get('IamInstanceProfile') or {}
+        
         return {
             'instance_id': instance_id,
             'name': instance_name,
@@ -321,28 +622,41 @@ class EC2Service:
             'private_ip': private_ip,
             'vpc_id': instance.get('VpcId', 'N/A'),
             'subnet_id': instance.get('SubnetId', 'N/A'),
-            'availability_zone': instance.get('Placement', {}).get('AvailabilityZone', 'N/A'),
+            'availability_zone': placement.get('AvailabilityZone', 'N/A'),
             'platform': instance.get('Platform', 'linux'),
             'architecture': instance.get('Architecture', 'N/A'),
             'tags': tag_dict,
             'security_groups': security_groups,
             'block_devices': block_devices,
-            'monitoring': instance.get('Monitoring', {}).get('State', 'disabled'),
-            'iam_instance_profile': instance.get('IamInstanceProfile', {}).get('Arn', 'N/A') if instance.get('IamInstanceProfile') else 'N/A'
+            'monitoring': monitoring.get('State', 'disabled'),
+            'iam_instance_profile': iam_profile.get('Arn', 'N/A')
         }
     
     def get_instances_by_state(self, state: str) -> List[Dict[str, Any]]:
         """
         Get instances filtered by state.
         
+        A fresh cached instance list is filtered in memory. Otherwise the
+        state filter is sent to DescribeInstances, so only matching
+        instances are transferred and formatted.
+        
         Args:
             state: Instance state to filter by
             
         Returns:
             List of instances in the specified state
         """
-        all_instances = self.get_all_instances()
-        return [instance for instance in all_instances if instance['state'].lower() == state.lower()]
+        state = state.lower()
+        snapshot = self._fresh_snapshot()
+        if snapshot is None and not self.demo_mode:
+            return self.get_all_instances(filters=[{'Name': 'instance-state-name', 'Values': [state]}])
+        
+        if snapshot is None:
+            snapshot = self._get_instances_snapshot()
+        return [
+            instance for instance, instance_state in zip(snapshot.instances, snapshot.states)
+            if instance_state == state
+        ]
     
     def get_running_instances(self) -> List[Dict[str, Any]]:
         """Get all running instances."""
@@ -359,25 +673,37 @@ class EC2Service:
         Returns:
             Dictionary with instance statistics
         """
-        instances = self.get_all_instances()
+        snapshot = self._get_instances_snapshot()
+        states = Counter(snapshot.states)
+        instance_types = Counter(snapshot.instance_types)
         
-        total_instances = len(instances)
-        running_instances = len([i for i in instances if i['state'] == 'running'])
-        stopped_instances = len([i for i in instances if i['state'] == 'stopped'])
-        pending_instances = len([i for i in instances if i['state'] == 'pending'])
-        terminated_instances = len([i for i in instances if i['state'] == 'terminated'])
+        return {
+            'total': len(snapshot.instances),
+            'running': states['running'],
+            'stopped': states['stopped'],
+            'pending': states['pending'],
+            'terminated': states['terminated'],
+            'by_type': dict(instance_types)
+        } 
+
+
+@lru_cache(maxsize=32)
+def get_ec2_service(region_name: str = 'us-east-1') -> EC2Service:
+    """
+    Get a shared EC2Service for a region.
+    
+    boto3 clients are thread-safe, so one service per region is reused across
+    requests instead of building a new client every time.
+    
+    Args:
+        region_name: AWS region name
         
-        # Count by instance type
-        instance_types = {}
-        for instance in instances:
-            instance_type = instance['instance_type']
-            instance_types[instance_type] = instance_types.get(instance_type, 0) + 1
+    Returns:
+        EC2Service instance for the region
         
-        return {
-            'total': total_instances,
-            'running': running_instances,
-            'stopped': stopped_instances,
-            'pending': pending_instances,
-            'terminated': terminated_instances,
-            'by_type': instance_types
-        } 
\ No newline at end of file
+    Raises:
+        ValueError: If the region is not supported
+    """
+    # Checked first so unknown names never take a slot in the cache
+    check_region(region_name)
+    return EC2Service(region_name)
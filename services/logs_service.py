@@ -2,16 +2,42 @@
 CloudWatch Logs service module for AWS Diagnostic Tool.
 Handles all CloudWatch Logs-related operations using Boto3.
 """
-import boto3
-from typing import Dict, List, Any, Optional
-from botocore.exceptions import ClientError, NoCredentialsError
+import heapq
+import re
+from functools import cached_property, lru_cache
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime, timedelta
+from services import _session
+from services._session import check_region, get_client
+from utils.cache import ttl_cached
+from utils.concurrency import submit
 from utils.helpers import sanitize_log_content
 
 
+# Common log group name patterns for EC2 instances, filled with the instance ID
+_INSTANCE_GROUP_PATTERNS = (
+    '/aws/ec2/{}',
+    'ec2-{}',
+    'instance-{}',
+    '/aws/ec2/instances/{}'
+)
+
+# Log groups scanned for an instance's errors; 'err' also covers 'error'
+_ERROR_GROUP_RE = re.compile('err', re.IGNORECASE)
+
+
+class LogsError(Exception):
+    """Raised when a CloudWatch Logs request fails; the botocore error is chained as __cause__."""
+
+
 class LogsService:
     """Service class for CloudWatch Logs operations."""
     
+    # Seconds to reuse the log group listing; groups change rarely
+    LOG_GROUPS_CACHE_TTL = 300
+    
     def __init__(self, region_name: str = 'us-east-1'):
         """
         Initialize CloudWatch Logs service with specified region.
@@ -20,73 +46,87 @@ class LogsService:
             region_name: AWS region name
         """
         self.region_name = region_name
-        self.client = boto3.client('logs', region_name=region_name)
     
+    @cached_property
+    def client(self):
+        """Shared CloudWatch Logs client for the region, created on first use."""
+        return get_client('logs', self.region_name)
+    
+    @ttl_cached(LOG_GROUPS_CACHE_TTL, maxsize=1)
     def get_log_groups(self) -> List[Dict[str, Any]]:
         """
         Get all CloudWatch log groups.
         
+        DescribeLogGroups returns at most 50 groups per call, so every page
+        is fetched to list accounts with more groups completely. The listing
+        is cached for LOG_GROUPS_CACHE_TTL seconds; callers must treat it
+        as read-only.
+        
         Returns:
             List of log group information
         """
         try:
-            response = self.client.describe_log_groups()
+            paginator = self.client.get_paginator('describe_log_groups')
             
             log_groups = []
-            for group in response['logGroups']:
-                log_group_info = {
-                    'log_group_name': group['logGroupName'],
-                    'creation_time': group.get('creationTime'),
-                    'stored_bytes': group.get('storedBytes', 0),
-                    'metric_filter_count': group.get('metricFilterCount', 0),
-                    'arn': group.get('arn'),
-                    'retention_in_days': group.get('retentionInDays')
-                }
-                log_groups.append(log_group_info)
+            for page in paginator.paginate():
+                for group in page['logGroups']:
+                    log_group_info = {
+                        'log_group_name': group['logGroupName'],
+                        'creation_time': group.get('creationTime'),
+                        'stored_bytes': group.get('storedBytes', 0),
+                        'metric_filter_count': group.get('metricFilterCount', 0),
+                        'arn': group.get('arn'),
+                        'retention_in_days': group.get('retentionInDays')
+                    }
+                    log_groups.append(log_group_info)
             
             return log_groups
             
-        except ClientError as e:
-            raise Exception(f"Error fetching log groups: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise LogsError(f"Error fetching log groups: {e}") from e
+    
+    def invalidate_log_groups_cache(self) -> None:
+        """Drop the cached log group listing so the next call re-fetches it."""
+        LogsService.get_log_groups.cache_clear(self)
     
     def get_log_streams(self, log_group_name: str) -> List[Dict[str, Any]]:
         """
-        Get log streams for a specific log group.
+        Get the most recently active log streams of a log group.
         
         Args:
             log_group_name: Name of the log group
             
         Returns:
-            List of log stream information
+            List of up to 50 log streams, most recent event first
         """
         try:
-            response = self.client.describe_log_streams(
+            # maxItems is a paginator setting, not a DescribeLogStreams parameter
+            paginator = self.client.get_paginator('describe_log_streams')
+            pages = paginator.paginate(
                 logGroupName=log_group_name,
                 orderBy='LastEventTime',
                 descending=True,
-                maxItems=50
+                PaginationConfig={'MaxItems': 50}
             )
             
             log_streams = []
-            for stream in response['logStreams']:
-                stream_info = {
-                    'log_stream_name': stream['logStreamName'],
-                    'creation_time': stream.get('creationTime'),
-                    'first_event_time': stream.get('firstEventTime'),
-                    'last_event_time': stream.get('lastEventTime'),
-                    'stored_bytes': stream.get('storedBytes', 0),
-                    'arn': stream.get('arn')
-                }
-                log_streams.append(stream_info)
+            for page in pages:
+                for stream in page['logStreams']:
+                    stream_info = {
+                        'log_stream_name': stream['logStreamName'],
+                        'creation_time': stream.get('creationTime'),
+                        'first_event_time': stream.get('firstEventTime'),
+                        'last_event_time': stream.get('lastEventTime'),
+                        'stored_bytes': stream.get('storedBytes', 0),
+                        'arn': stream.get('arn')
+                    }
+                    log_streams.append(stream_info)
             
             return log_streams
             
-        except ClientError as e:
-            raise Exception(f"Error fetching log streams: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise LogsError(f"Error fetching log streams: {e}") from e
     
     def get_log_events(self, log_group_name: str, log_stream_name: str, 
                       start_time: Optional[int] = None, end_time: Optional[int] = None,
@@ -104,6 +144,28 @@ class LogsService:
         Returns:
             List of log events
         """
+        return list(self.iter_log_events(log_group_name, log_stream_name, start_time, end_time, limit))
+    
+    def iter_log_events(self, log_group_name: str, log_stream_name: str,
+                        start_time: Optional[int] = None, end_time: Optional[int] = None,
+                        limit: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the newest log events of a stream, oldest first.
+        
+        One GetLogEvents call returns the latest `limit` events of the time
+        range. Its forward token only ever leads to newer events, so it is
+        not followed; that would cost an empty round trip per stream.
+        
+        Args:
+            log_group_name: Name of the log group
+            log_stream_name: Name of the log stream
+            start_time: Start time in milliseconds since epoch
+            end_time: End time in milliseconds since epoch
+            limit: Maximum number of events to yield
+            
+        Yields:
+            Log events
+        """
         try:
             kwargs = {
                 'logGroupName': log_group_name,
@@ -118,21 +180,15 @@ class LogsService:
             
             response = self.client.get_log_events(**kwargs)
             
-            events = []
-            for event in response['events']:
-                event_info = {
-                    'timestamp': event['timestamp'],
-                    'message': sanitize_log_content(event['message']),
-                    'ingestion_time': event.get('ingestionTime')
-                }
-                events.append(event_info)
-            
-            return events
-            
-        except ClientError as e:
-            raise Exception(f"Error fetching log events: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise LogsError(f"Error fetching log events: {e}") from e
+        
+        for event in response['events']:
+            yield {
+                'timestamp': event['timestamp'],
+                'message': sanitize_log_content(event['message']),
+                'ingestion_time': event.get('ingestionTime')
+            }
     
     def get_recent_logs(self, log_group_name: str, hours: int = 1, 
                        limit: int = 100) -> List[Dict[str, Any]]:
@@ -147,39 +203,90 @@ class LogsService:
         Returns:
             List of recent log events
         """
-        try:
-            # Calculate time range
-            end_time = datetime.utcnow()
-            start_time = end_time - timedelta(hours=hours)
-            
-            # Convert to milliseconds
-            start_ms = int(start_time.timestamp() * 1000)
-            end_ms = int(end_time.timestamp() * 1000)
+        streams = self.get_log_streams(log_group_name)
+        return self._recent_events({log_group_name: streams}, hours, limit)[log_group_name]
+    
+    def _recent_logs_for_groups(self, log_group_names: List[str], hours: int,
+                                limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get recent log events for several log groups at once.
+        
+        All stream listings are issued concurrently, then all event fetches,
+        so the wall time is about two round trips however many groups match.
+        Groups whose streams can't be listed are left out.
+        
+        Args:
+            log_group_names: Names of the log groups
+            hours: Number of hours to look back
+            limit: Maximum number of events to retrieve per group
             
-            # Get log streams
-            streams = self.get_log_streams(log_group_name)
+        Returns:
+            Dictionary mapping each listed group to its recent log events
+        """
+        futures = {name: submit(self.get_log_streams, name) for name in log_group_names}
+        
+        streams_by_group = {}
+        for name, future in futures.items():
+            try:
+                streams_by_group[name] = future.result()
+            except LogsError:
+                continue
+        
+        return self._recent_events(streams_by_group, hours, limit)
+    
+    def _recent_events(self, streams_by_group: Dict[str, List[Dict[str, Any]]], hours: int,
+                       limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch recent events from up to five streams per group concurrently.
+        
+        Args:
+            streams_by_group: Log streams per group, most recent first
+            hours: Number of hours to look back
+            limit: Maximum number of events to retrieve per group
             
-            all_events = []
-            for stream in streams[:5]:  # Limit to 5 most recent streams
+        Returns:
+            Dictionary mapping each group to its events, newest first
+        """
+        # Calculate time range
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(hours=hours)
+        
+        # Convert to milliseconds
+        start_ms = int(start_time.timestamp() * 1000)
+        end_ms = int(end_time.timestamp() * 1000)
+        
+        # Every fetch is submitted before any result is awaited
+        futures = {
+            name: [
+                submit(
+                    self.get_log_events,
+                    name,
+                    stream['log_stream_name'],
+                    start_time=start_ms,
+                    end_time=end_ms,
+                    limit=limit // 5  # Distribute limit across streams
+                )
+                for stream in streams[:5]  # Limit to 5 most recent streams
+            ]
+            for name, streams in streams_by_group.items()
+        }
+        
+        events_by_group = {}
+        for name, stream_futures in futures.items():
+            stream_events = []
+            for future in stream_futures:
                 try:
-                    events = self.get_log_events(
-                        log_group_name, 
-                        stream['log_stream_name'],
-                        start_time=start_ms,
-                        end_time=end_ms,
-                        limit=limit // 5  # Distribute limit across streams
-                    )
-                    all_events.extend(events)
-                except Exception:
+                    # GetLogEvents returns each stream oldest first
+                    stream_events.append(future.result()[::-1])
+                except LogsError:
                     # Skip streams that can't be accessed
                     continue
             
-            # Sort by timestamp and limit
-            all_events.sort(key=lambda x: x['timestamp'], reverse=True)
-            return all_events[:limit]
-            
-        except Exception as e:
-            raise Exception(f"Error fetching recent logs: {str(e)}")
+            # Merge the already ordered streams, newest first, stopping at limit
+            merged = heapq.merge(*stream_events, key=itemgetter('timestamp'), reverse=True)
+            events_by_group[name] = list(islice(merged, limit))
+        
+        return events_by_group
     
     def search_logs(self, log_group_name: str, filter_pattern: str, 
                    hours: int = 1) -> List[Dict[str, Any]]:
@@ -194,39 +301,51 @@ class LogsService:
         Returns:
             List of matching log events
         """
+        return list(self.iter_search_logs(log_group_name, filter_pattern, hours))
+    
+    def iter_search_logs(self, log_group_name: str, filter_pattern: str,
+                         hours: int = 1, limit: int = 100) -> Iterator[Dict[str, Any]]:
+        """
+        Yield log events matching a filter pattern, one page at a time.
+        
+        Events are yielded as each filter_log_events page arrives, so callers
+        can start streaming before the whole search completes.
+        
+        Args:
+            log_group_name: Name of the log group
+            filter_pattern: CloudWatch Logs filter pattern
+            hours: Number of hours to look back
+            limit: Maximum number of events to yield
+            
+        Yields:
+            Matching log events
+        """
         try:
             # Calculate time range
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(hours=hours)
             
-            # Convert to milliseconds
-            start_ms = int(start_time.timestamp() * 1000)
-            end_ms = int(end_time.timestamp() * 1000)
-            
-            response = self.client.filter_log_events(
+            # One server-side scan of the whole group, stopped after limit events
+            paginator = self.client.get_paginator('filter_log_events')
+            pages = paginator.paginate(
                 logGroupName=log_group_name,
-                startTime=start_ms,
-                endTime=end_ms,
+                startTime=int(start_time.timestamp() * 1000),
+                endTime=int(end_time.timestamp() * 1000),
                 filterPattern=filter_pattern,
-                maxItems=100
+                PaginationConfig={'MaxItems': limit, 'PageSize': min(limit, 10000)}
             )
             
-            events = []
-            for event in response['events']:
-                event_info = {
-                    'timestamp': event['timestamp'],
-                    'message': sanitize_log_content(event['message']),
-                    'log_stream_name': event['logStreamName'],
-                    'ingestion_time': event.get('ingestionTime')
-                }
-                events.append(event_info)
-            
-            return events
-            
-        except ClientError as e:
-            raise Exception(f"Error searching logs: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+            for page in pages:
+                for event in page['events']:
+                    yield {
+                        'timestamp': event['timestamp'],
+                        'message': sanitize_log_content(event['message']),
+                        'log_stream_name': event['logStreamName'],
+                        'ingestion_time': event.get('ingestionTime')
+                    }
+            
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise LogsError(f"Error searching logs: {e}") from e
     
     def get_instance_logs(self, instance_id: str, hours: int = 1) -> Dict[str, Any]:
         """
@@ -239,58 +358,51 @@ class LogsService:
         Returns:
             Dictionary with various log sources for the instance
         """
-        try:
-            logs_data = {
-                'instance_id': instance_id,
-                'timestamp': datetime.utcnow().isoformat(),
-                'duration_hours': hours,
-                'console_output': None,
-                'system_logs': [],
-                'application_logs': [],
-                'error_logs': []
-            }
-            
-            # Try to find log groups that might contain instance logs
-            log_groups = self.get_log_groups()
-            
-            # Common log group patterns for EC2 instances
-            instance_patterns = [
-                f"/aws/ec2/{instance_id}",
-                f"ec2-{instance_id}",
-                f"instance-{instance_id}",
-                f"/aws/ec2/instances/{instance_id}"
-            ]
-            
-            for pattern in instance_patterns:
-                for group in log_groups:
-                    if pattern in group['log_group_name']:
-                        try:
-                            recent_logs = self.get_recent_logs(
-                                group['log_group_name'], 
-                                hours, 
-                                limit=50
-                            )
-                            logs_data['system_logs'].extend(recent_logs)
-                        except Exception:
-                            continue
-            
-            # Search for error logs
-            for group in log_groups:
-                if 'error' in group['log_group_name'].lower() or 'err' in group['log_group_name'].lower():
-                    try:
-                        error_logs = self.search_logs(
-                            group['log_group_name'],
-                            f'"{instance_id}"',
-                            hours
-                        )
-                        logs_data['error_logs'].extend(error_logs)
-                    except Exception:
-                        continue
-            
-            return logs_data
-            
-        except Exception as e:
-            raise Exception(f"Error fetching instance logs: {str(e)}")
+        logs_data = {
+            'instance_id': instance_id,
+            'timestamp': datetime.utcnow().isoformat(),
+            'duration_hours': hours,
+            'console_output': None,
+            'system_logs': [],
+            'application_logs': [],
+            'error_logs': []
+        }
+        
+        # Try to find log groups that might contain instance logs
+        log_groups = self.get_log_groups()
+        
+        # All instance patterns as one alternation, so each group name is scanned once
+        instance_re = re.compile('|'.join(
+            re.escape(pattern.format(instance_id)) for pattern in _INSTANCE_GROUP_PATTERNS
+        ))
+        
+        system_groups = []
+        error_groups = []
+        for group in log_groups:
+            name = group['log_group_name']
+            if instance_re.search(name):
+                system_groups.append(name)
+            if _ERROR_GROUP_RE.search(name):
+                error_groups.append(name)
+        
+        # Start the error log searches first so they overlap the system log fetches
+        error_futures = [
+            submit(self.search_logs, name, f'"{instance_id}"', hours)
+            for name in error_groups
+        ]
+        
+        recent_logs = self._recent_logs_for_groups(system_groups, hours, limit=50)
+        for name in system_groups:
+            logs_data['system_logs'].extend(recent_logs.get(name, []))
+        
+        # Search for error logs
+        for future in error_futures:
+            try:
+                logs_data['error_logs'].extend(future.result())
+            except LogsError:
+                continue
+        
+        return logs_data
     
     def get_application_logs(self, application_name: str, hours: int = 1) -> List[Dict[str, Any]]:
         """
@@ -303,26 +415,21 @@ class LogsService:
         Returns:
             List of application log events
         """
-        try:
-            log_groups = self.get_log_groups()
-            
-            app_logs = []
-            for group in log_groups:
-                if application_name.lower() in group['log_group_name'].lower():
-                    try:
-                        logs = self.get_recent_logs(
-                            group['log_group_name'],
-                            hours,
-                            limit=100
-                        )
-                        app_logs.extend(logs)
-                    except Exception:
-                        continue
-            
-            return app_logs
-            
-        except Exception as e:
-            raise Exception(f"Error fetching application logs: {str(e)}")
+        log_groups = self.get_log_groups()
+        
+        app_groups = [
+            group['log_group_name']
+            for group in log_groups
+            if application_name.lower() in group['log_group_name'].lower()
+        ]
+        
+        recent_logs = self._recent_logs_for_groups(app_groups, hours, limit=100)
+        
+        app_logs = []
+        for name in app_groups:
+            app_logs.extend(recent_logs.get(name, []))
+        
+        return app_logs
     
     def get_log_group_metrics(self, log_group_name: str) -> Dict[str, Any]:
         """
@@ -351,7 +458,24 @@ class LogsService:
             
             return {}
             
-        except ClientError as e:
-            raise Exception(f"Error fetching log group metrics: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}") 
\ No newline at end of file
+        except (_session.BotoCoreError, _session.ClientError) as e:
+            raise LogsError(f"Error fetching log group metrics: {e}") from e 
+
+
+@lru_cache(maxsize=32)
+def get_logs_service(region_name: str = 'us-east-1') -> LogsService:
+    """
+    Get the LogsService for a region, creating it on first use.
+    
+    Args:
+        region_name: AWS region name
+        
+    Returns:
+        LogsService instance for the region
+        
+    Raises:
+        ValueError: If the region is not supported
+    """
+    # Checked first so unknown names never take a slot in the cache
+    check_region(region_name)
+    return LogsService(region_name)
@@ -1,3 +1,5 @@
+import os
+
 from flask import Flask
 
 app = Flask(__name__)
@@ -7,5 +9,8 @@ def hello():
     return 'Hello, AWS Diagnostic Tool!'
 
 if __name__ == '__main__':
+    # The debugger and reloader only run when asked for with DEBUG=1; for
+    # load testing, serve `simple_test:app` with gunicorn (gthread workers)
+    debug = os.environ.get('DEBUG') == '1'
     print("Starting simple Flask test...")
-    app.run(host='0.0.0.0', port=5002, debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5002, debug=debug, threaded=True)
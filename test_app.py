@@ -1,52 +1,58 @@
 #!/usr/bin/env python3
 """
 Simple test script to verify the AWS Diagnostic Tool can start properly.
+
+Run with --profile-imports to list the slowest module imports instead,
+adding --json for machine-readable output.
 """
 
+import importlib
+import json
+import subprocess
 import sys
 import os
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# (module, attribute, label) for everything the app needs at startup
+_MODULES = [
+    ('flask', 'Flask', 'Flask'),
+    ('boto3', 'client', 'Boto3'),
+    ('config', 'config', 'Config'),
+    ('services.ec2_service', 'EC2Service', 'EC2Service'),
+    ('services.cloudwatch_service', 'CloudWatchService', 'CloudWatchService'),
+    ('routes.auth', 'auth_bp', 'Auth blueprint'),
+    ('routes.dashboard', 'dashboard_bp', 'Dashboard blueprint'),
+    ('routes.api', 'api_bp', 'API blueprint'),
+    ('app', 'create_app', 'App factory'),
+]
+
+def _import_modules():
+    """Import everything in _MODULES, keeping each failure for reporting."""
+    imported, errors = {}, {}
+    for module_name, attr, label in _MODULES:
+        try:
+            imported[attr] = getattr(importlib.import_module(module_name), attr)
+        except Exception as e:
+            errors[label] = e
+    return imported, errors
+
+# Import once at module load so the checks below only report the results
+_IMPORTED, _IMPORT_ERRORS = _import_modules()
+
 def test_imports():
     """Test if all required modules can be imported."""
-    try:
-        print("Testing imports...")
-        
-        # Test basic imports
-        from flask import Flask
-        print("✅ Flask imported successfully")
-        
-        from boto3 import client
-        print("✅ Boto3 imported successfully")
-        
-        from config import config
-        print("✅ Config imported successfully")
-        
-        # Test service imports
-        from services.ec2_service import EC2Service
-        print("✅ EC2Service imported successfully")
-        
-        from services.cloudwatch_service import CloudWatchService
-        print("✅ CloudWatchService imported successfully")
-        
-        # Test route imports
-        from routes.auth import auth_bp
-        print("✅ Auth blueprint imported successfully")
-        
-        from routes.dashboard import dashboard_bp
-        print("✅ Dashboard blueprint imported successfully")
-        
-        from routes.api import api_bp
-        print("✅ API blueprint imported successfully")
-        
-        print("\n🎉 All imports successful!")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Import error: {e}")
-        return False
+    print("Testing imports...")
+    
+    for module_name, attr, label in _MODULES:
+        if label in _IMPORT_ERRORS:
+            print(f"❌ Import error: {_IMPORT_ERRORS[label]}")
+            return False
+        print(f"✅ {label} imported successfully")
+    
+    print("\n🎉 All imports successful!")
+    return True
 
 def test_services():
     """Test if services can be instantiated."""
@@ -54,11 +60,11 @@ def test_services():
         print("\nTesting services...")
         
         # Test EC2 service
-        ec2_service = EC2Service('us-east-1')
+        ec2_service = _IMPORTED['EC2Service']('us-east-1')
         print("✅ EC2Service instantiated successfully")
         
         # Test CloudWatch service
-        cw_service = CloudWatchService('us-east-1')
+        cw_service = _IMPORTED['CloudWatchService']('us-east-1')
         print("✅ CloudWatchService instantiated successfully")
         
         print("🎉 All services working!")
@@ -73,8 +79,7 @@ def test_app_creation():
     try:
         print("\nTesting app creation...")
         
-        from app import create_app
-        app = create_app('development')
+        app = _IMPORTED['create_app']('development')
         print("✅ Flask app created successfully")
         
         print("🎉 App creation successful!")
@@ -84,6 +89,48 @@ def test_app_creation():
         print(f"❌ App creation error: {e}")
         return False
 
+def profile_imports(as_json=False, top=25):
+    """
+    Report per-module import time by re-running the imports under -X importtime.
+    
+    Args:
+        as_json: Print the full table as JSON for CI comparisons
+        top: Number of slowest modules to print in the table
+    
+    Returns:
+        Exit code of the profiled import
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import test_app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        if self_us.strip().isdigit():
+            timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    timings.sort(key=lambda t: t[1], reverse=True)
+    
+    if as_json:
+        print(json.dumps([
+            {'module': name, 'self_us': self_us, 'cumulative_us': cumulative_us}
+            for name, self_us, cumulative_us in timings
+        ], indent=2))
+        return result.returncode
+    
+    print(f"{'self [us]':>10} {'cumulative':>11}  module")
+    for name, self_us, cumulative_us in timings[:top]:
+        print(f"{self_us:>10} {cumulative_us:>11}  {name}")
+    print(f"\nTotal: {sum(t[1] for t in timings) / 1000:.1f} ms across {len(timings)} modules")
+    return result.returncode
+
 def main():
     """Run all tests."""
     print("=" * 50)
@@ -114,4 +161,6 @@ def main():
         return 1
 
 if __name__ == '__main__':
+    if '--profile-imports' in sys.argv:
+        sys.exit(profile_imports(as_json='--json' in sys.argv))
     sys.exit(main()) 
\ No newline at end of file
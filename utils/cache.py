@@ -0,0 +1,57 @@
+"""
+Per-instance TTL caching for service methods.
+"""
+import threading
+from functools import wraps
+from typing import Any, Callable
+
+from cachetools import TTLCache
+
+# Cache lookup sentinel, distinct from a cached None
+_MISSING = object()
+
+
+def ttl_cached(ttl: float, maxsize: int = 256) -> Callable:
+    """
+    Cache a method's results per instance for ttl seconds.
+
+    Entries are keyed on the call's arguments, which must be hashable.
+    Exceptions are not cached, and callers must treat returned values as
+    read-only because every hit returns the same object.
+
+    Args:
+        ttl: Seconds to keep each result
+        maxsize: Maximum number of cached argument combinations per instance
+
+    Returns:
+        Method decorator
+    """
+    def decorator(method: Callable) -> Callable:
+        attr = f'_ttl_cache_{method.__name__}'
+        # Guards creation of the per-instance cache and every access to it
+        lock = threading.Lock()
+
+        @wraps(method)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            key = (args, frozenset(kwargs.items()))
+            with lock:
+                cache = self.__dict__.get(attr)
+                if cache is None:
+                    cache = self.__dict__[attr] = TTLCache(maxsize=maxsize, ttl=ttl)
+                value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            value = method(self, *args, **kwargs)
+            with lock:
+                cache[key] = value
+            return value
+
+        def cache_clear(self) -> None:
+            """Drop every cached result of this method for one instance."""
+            with lock:
+                self.__dict__.pop(attr, None)
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
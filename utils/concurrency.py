@@ -0,0 +1,25 @@
+"""
+Thread pool helpers for overlapping independent AWS calls.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+# Shared pool for I/O-bound boto3 calls; the per-region token buckets and
+# client connection pools bound what actually reaches AWS at once
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='aws')
+
+
+def submit(fn: Callable, *args: Any, **kwargs: Any) -> Future:
+    """
+    Run fn(*args, **kwargs) on the shared pool.
+
+    Args:
+        fn: Callable to run
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Future for the call's result
+    """
+    return _executor.submit(fn, *args, **kwargs)
+
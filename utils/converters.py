@@ -0,0 +1,13 @@
+"""
+URL converters for the AWS Diagnostic Tool.
+"""
+from werkzeug.routing import BaseConverter
+
+
+class InstanceIDConverter(BaseConverter):
+    """
+    Match EC2 instance IDs (``i-`` followed by 8 to 17 hex digits), so
+    malformed IDs 404 in routing instead of reaching boto3.
+    """
+
+    regex = r'i-[0-9a-f]{8,17}'
@@ -1,86 +1,165 @@
 """
 Helper utility functions for the AWS Diagnostic Tool.
 """
-import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+import html
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Any, NamedTuple, Optional
+from config import Config
+
+
+class CredentialStatus(NamedTuple):
+    """Result of validate_aws_credentials."""
+    valid: bool
+    error: Optional[str]
+
+
+class AlertStatus(NamedTuple):
+    """
+    CPU alert status of an instance.
+    
+    Templates read it by attribute like the dict it replaces, and the JSON
+    provider serializes it as an object, so API responses keep their shape.
+    """
+    alert: bool
+    severity: str
+    message: str
 
 
 def format_datetime(dt: datetime) -> str:
     """Format datetime object to human-readable string."""
-    return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+    # Fixed format, so build it from the fields rather than going through strftime
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+            f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d} UTC")
+
+
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
 
 
 def format_bytes(bytes_value: int) -> str:
     """Convert bytes to human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if bytes_value < 1024.0:
-            return f"{bytes_value:.2f} {unit}"
-        bytes_value /= 1024.0
-    return f"{bytes_value:.2f} PB"
+    if bytes_value < 1024:
+        return f"{bytes_value:.2f} B"
+    # Each unit is 2**10 of the previous one, so the bit length picks it directly
+    unit = min((int(bytes_value).bit_length() - 1) // 10, 5)
+    return f"{bytes_value / (1 << (10 * unit)):.2f} {_BYTE_UNITS[unit]}"
+
+
+# Bootstrap color classes for instance states
+_STATE_COLORS = {
+    'running': 'success',
+    'stopped': 'danger',
+    'pending': 'warning',
+    'terminated': 'secondary',
+    'stopping': 'warning',
+    'starting': 'info'
+}
 
 
 def get_instance_state_color(state: str) -> str:
     """Get Bootstrap color class for instance state."""
-    state_colors = {
-        'running': 'success',
-        'stopped': 'danger',
-        'pending': 'warning',
-        'terminated': 'secondary',
-        'stopping': 'warning',
-        'starting': 'info'
-    }
-    return state_colors.get(state.lower(), 'secondary')
+    # EC2 reports states in lowercase, so the common case skips str.lower()
+    color = _STATE_COLORS.get(state)
+    if color is None:
+        color = _folded_state_color(state)
+    return color
+
+
+@lru_cache(maxsize=32)
+def _folded_state_color(state: str) -> str:
+    """Look up a state that is not already lowercase, caching the folded result."""
+    return _STATE_COLORS.get(state.lower(), 'secondary')
+
+
+# Seconds to reuse a successful credential check
+CREDENTIALS_CACHE_TTL = 300
+_VALID_CREDENTIALS = CredentialStatus(True, None)
+_last_valid_check = float('-inf')
 
 
-def validate_aws_credentials() -> Dict[str, Any]:
+def probe_aws_credentials() -> CredentialStatus:
     """
-    Validate AWS credentials and return status.
+    Check AWS credentials with one STS GetCallerIdentity call, uncached.
     
     Returns:
-        Dict containing validation status and error message if any
+        CredentialStatus with the validation result and error message if any
     """
+    # Imported here so the pure formatting helpers load without botocore
+    from botocore.exceptions import ClientError, NoCredentialsError
+    from services._session import get_client
+    
     try:
-        # Try to create a simple AWS client to test credentials
-        sts = boto3.client('sts')
+        # Reuse the services' session, so credentials are resolved only once
+        sts = get_client('sts', Config.AWS_DEFAULT_REGION)
         sts.get_caller_identity()
-        return {'valid': True, 'error': None}
+        return _VALID_CREDENTIALS
     except NoCredentialsError:
-        return {'valid': False, 'error': 'AWS credentials not found'}
+        return CredentialStatus(False, 'AWS credentials not found')
     except ClientError as e:
-        return {'valid': False, 'error': f'AWS credentials error: {str(e)}'}
+        return CredentialStatus(False, f'AWS credentials error: {str(e)}')
     except Exception as e:
-        return {'valid': False, 'error': f'Unexpected error: {str(e)}'}
+        return CredentialStatus(False, f'Unexpected error: {str(e)}')
+
+
+def validate_aws_credentials() -> CredentialStatus:
+    """
+    Validate AWS credentials and return status.
+    
+    Only successful checks are cached, for CREDENTIALS_CACHE_TTL seconds.
+    Failures are never stored, so the next call probes again and picks up
+    fixed credentials without callers having to clear anything.
+    
+    Returns:
+        CredentialStatus with the validation result and error message if any
+    """
+    global _last_valid_check
+    if time.monotonic() - _last_valid_check < CREDENTIALS_CACHE_TTL:
+        return _VALID_CREDENTIALS
+    
+    status = probe_aws_credentials()
+    if status.valid:
+        _last_valid_check = time.monotonic()
+    return status
+
+
+# Human-readable names for the regions in Config.SUPPORTED_REGIONS
+_REGION_DISPLAY_NAMES = {
+    'us-east-1': 'US East (N. Virginia)',
+    'us-east-2': 'US East (Ohio)',
+    'us-west-1': 'US West (N. California)',
+    'us-west-2': 'US West (Oregon)',
+    'eu-west-1': 'Europe (Ireland)',
+    'eu-west-2': 'Europe (London)',
+    'eu-west-3': 'Europe (Paris)',
+    'eu-central-1': 'Europe (Frankfurt)',
+    'ap-southeast-1': 'Asia Pacific (Singapore)',
+    'ap-southeast-2': 'Asia Pacific (Sydney)',
+    'ap-northeast-1': 'Asia Pacific (Tokyo)',
+    'ap-northeast-2': 'Asia Pacific (Seoul)',
+    'sa-east-1': 'South America (Sao Paulo)',
+    'ca-central-1': 'Canada (Central)'
+}
+
+# Built once at import; the supported region list is static configuration
+_AWS_REGIONS = [
+    {
+        'name': region,
+        'endpoint': f'ec2.{region}.amazonaws.com',
+        'display_name': _REGION_DISPLAY_NAMES.get(region, region.replace('-', ' ').title())
+    }
+    for region in Config.SUPPORTED_REGIONS
+]
 
 
 def get_aws_regions() -> List[Dict[str, str]]:
     """
-    Get list of available AWS regions.
+    Get list of supported AWS regions.
     
     Returns:
         List of dictionaries with region information
     """
-    try:
-        ec2 = boto3.client('ec2')
-        regions = ec2.describe_regions()
-        return [
-            {
-                'name': region['RegionName'],
-                'endpoint': region['Endpoint'],
-                'display_name': region['RegionName'].replace('-', ' ').title()
-            }
-            for region in regions['Regions']
-        ]
-    except Exception:
-        # Fallback to common regions if API call fails
-        return [
-            {'name': 'us-east-1', 'endpoint': 'ec2.us-east-1.amazonaws.com', 'display_name': 'US East (N. Virginia)'},
-            {'name': 'us-west-2', 'endpoint': 'ec2.us-west-2.amazonaws.com', 'display_name': 'US West (Oregon)'},
-            {'name': 'eu-west-1', 'endpoint': 'ec2.eu-west-1.amazonaws.com', 'display_name': 'Europe (Ireland)'},
-            {'name': 'ap-southeast-1', 'endpoint': 'ec2.ap-southeast-1.amazonaws.com', 'display_name': 'Asia Pacific (Singapore)'}
-        ]
+    return list(_AWS_REGIONS)
 
 
 def parse_instance_tags(tags: List[Dict[str, str]]) -> Dict[str, str]:
@@ -109,8 +188,11 @@ def get_instance_name(tags: List[Dict[str, str]]) -> str:
     Returns:
         Instance name or 'Unnamed Instance'
     """
-    tag_dict = parse_instance_tags(tags)
-    return tag_dict.get('Name', 'Unnamed Instance')
+    # Scan for the one tag instead of building the whole tag dictionary
+    for tag in tags or ():
+        if tag['Key'] == 'Name':
+            return tag['Value']
+    return 'Unnamed Instance'
 
 
 def format_metric_data(metric_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -144,7 +226,16 @@ def format_metric_data(metric_data: List[Dict[str, Any]]) -> List[Dict[str, Any]
     return formatted_data
 
 
-def calculate_alert_status(cpu_utilization: float, threshold: float = 80.0) -> Dict[str, Any]:
+# (alert, severity, message prefix) per alert level, indexed by calculate_alert_status
+_ALERT_LEVELS = (
+    (False, 'none', 'Normal'),
+    (True, 'low', 'Elevated'),
+    (True, 'medium', 'High'),
+    (True, 'high', 'High'),
+)
+
+
+def calculate_alert_status(cpu_utilization: float, threshold: float = 80.0) -> AlertStatus:
     """
     Calculate alert status based on CPU utilization.
     
@@ -153,26 +244,15 @@ def calculate_alert_status(cpu_utilization: float, threshold: float = 80.0) -> D
         threshold: Alert threshold percentage
         
     Returns:
-        Dictionary with alert status and severity
-    """
-    if cpu_utilization >= threshold:
-        return {
-            'alert': True,
-            'severity': 'high' if cpu_utilization >= 90 else 'medium',
-            'message': f'High CPU usage: {cpu_utilization:.1f}%'
-        }
-    elif cpu_utilization >= threshold * 0.7:  # 70% of threshold
-        return {
-            'alert': True,
-            'severity': 'low',
-            'message': f'Elevated CPU usage: {cpu_utilization:.1f}%'
-        }
-    else:
-        return {
-            'alert': False,
-            'severity': 'none',
-            'message': f'Normal CPU usage: {cpu_utilization:.1f}%'
-        }
+        AlertStatus with alert flag, severity and message
+    """
+    # Each crossed bound moves one level up: 70% of threshold, threshold,
+    # then 90% for high severity once the threshold itself is crossed
+    level = ((cpu_utilization >= threshold * 0.7)
+             + (cpu_utilization >= threshold)
+             + (cpu_utilization >= max(threshold, 90)))
+    alert, severity, prefix = _ALERT_LEVELS[level]
+    return AlertStatus(alert, severity, f'{prefix} CPU usage: {cpu_utilization:.1f}%')
 
 
 def sanitize_log_content(content: str, max_length: int = 1000) -> str:
@@ -193,22 +273,35 @@ def sanitize_log_content(content: str, max_length: int = 1000) -> str:
     if len(content) > max_length:
         content = content[:max_length] + "... (truncated)"
     
-    # Basic HTML escaping (Flask's Markup will handle this, but good practice)
-    content = content.replace('<', '&lt;').replace('>', '&gt;')
-    
-    return content
+    # Basic HTML escaping in one pass; '&' is escaped too so entities in the
+    # raw log text are shown literally
+    return html.escape(content, quote=False)
 
 
-def get_time_range(hours: int = 1) -> tuple:
+def get_time_range(hours: int = 1, period: int = 300) -> tuple:
     """
-    Get start and end time for metric queries.
+    Get start and end time for metric queries, aligned to the metric period.
+    
+    Both ends fall on period boundaries, so every query issued within the
+    same period asks for exactly the same datapoints.
     
     Args:
         hours: Number of hours to look back
+        period: Metric period in seconds to align to
         
     Returns:
-        Tuple of (start_time, end_time) as datetime objects
+        Tuple of (start_time, end_time) as naive UTC datetime objects
+    """
+    return _aligned_time_range(hours, int(time.time()) // period * period)
+
+
+@lru_cache(maxsize=32)
+def _aligned_time_range(hours: int, end_timestamp: int) -> tuple:
+    """
+    Build the (start_time, end_time) pair ending at an aligned timestamp.
+    
+    Cached because every query in the same period bucket asks for the same
+    window; the datetimes are immutable, so callers can share them.
     """
-    end_time = datetime.utcnow()
-    start_time = end_time - timedelta(hours=hours)
-    return start_time, end_time 
\ No newline at end of file
+    end_time = datetime.fromtimestamp(end_timestamp, timezone.utc).replace(tzinfo=None)
+    return end_time - timedelta(hours=hours), end_time
@@ -0,0 +1,156 @@
+"""
+orjson-backed JSON serialization for the AWS Diagnostic Tool.
+Replaces Flask's stdlib json encoder for API responses and templates.
+"""
+import json
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Callable, Iterable
+
+import orjson
+from flask import Response, current_app, request, stream_with_context
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import HTTPException
+
+# Options shared by every serialization path
+_BASE_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+# Marks an exhausted iterator in stream_json_list
+_END = object()
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, '_asdict'):
+        # NamedTuple results keep their object shape in the API
+        return obj._asdict()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Mirrors the sort_keys/compact behaviour of Flask's default provider so
+    `jsonify` and the `tojson` template filter keep working unchanged.
+    """
+
+    sort_keys = True
+    compact = None
+    mimetype = 'application/json'
+
+    def _options(self, indent: bool = False) -> int:
+        option = _BASE_OPTIONS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=self._options()).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            # Hooks such as the session serializer's object_hook need stdlib json
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self._options(indent)),
+            mimetype=self.mimetype
+        )
+
+
+def ojsonify(obj: Any, status: int = 200) -> Response:
+    """
+    Serialize obj with orjson and wrap it in a JSON response.
+
+    Args:
+        obj: JSON-serializable payload
+        status: HTTP status code
+
+    Returns:
+        Flask response with an application/json body
+    """
+    return current_app.response_class(
+        orjson.dumps(obj, default=_default, option=_BASE_OPTIONS),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def stream_json_list(key: str, items: Iterable[Any]) -> Response:
+    """
+    Stream {'success': true, key: [...]} while items are still being produced.
+
+    The first item is pulled before the response starts, so errors raised
+    up front (bad log group, missing permissions) still surface as a normal
+    500 from json_endpoint. A failure mid-stream can no longer change the
+    status code; it is reported in an 'error' field after the partial list.
+
+    Args:
+        key: Name of the list field in the payload
+        items: Iterable of JSON-serializable items
+
+    Returns:
+        Streaming Flask response with an application/json body
+    """
+    iterator = iter(items)
+    first = next(iterator, _END)
+
+    def generate():
+        yield b'{"success":true,' + orjson.dumps(key) + b':['
+        if first is not _END:
+            yield orjson.dumps(first, default=_default, option=_BASE_OPTIONS)
+            try:
+                for item in iterator:
+                    yield b',' + orjson.dumps(item, default=_default, option=_BASE_OPTIONS)
+            except Exception as e:
+                yield b'],"error":' + orjson.dumps(str(e)) + b'}'
+                return
+        yield b']}'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def json_endpoint(fn: Callable) -> Callable:
+    """
+    Turn a view returning a payload dict into a JSON API endpoint.
+
+    The payload is merged into {'success': True, ...} and tagged with an
+    ETag, so polling clients sending If-None-Match get a 304 when nothing
+    changed. Any exception becomes {'success': False, 'error': ...} with
+    status 500, or with the exception's own status for HTTP errors such as
+    BadRequest. Views that need a different status can also return a
+    Response and it is passed through as is.
+
+    Args:
+        fn: View function returning a dict or a Response
+
+    Returns:
+        Wrapped view function
+    """
+    @wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Response:
+        try:
+            result = fn(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            response = ojsonify({'success': True, **result})
+            response.add_etag()
+            return response.make_conditional(request)
+        except HTTPException as e:
+            return ojsonify({'success': False, 'error': e.description}, e.code)
+        except Exception as e:
+            return ojsonify({'success': False, 'error': str(e)}, 500)
+    return wrapper
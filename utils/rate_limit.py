@@ -0,0 +1,40 @@
+"""
+Client-side rate limiting for the AWS Diagnostic Tool.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at a steady rate.
+
+    Each acquire() takes one token, sleeping until one is available, so
+    bursts up to `capacity` go through at once and sustained traffic is
+    paced to `rate` calls per second.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum stored tokens; defaults to one second's worth
+        """
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self.tokens = self.capacity
+        self.last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, blocking until the bucket can provide it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.rate)
+            self.last_update = now
+            self.tokens -= 1
+            # A negative balance is the wait this caller owes
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)